@@ -1,17 +1,120 @@
 import javalang
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from collections import defaultdict
 from pydantic import BaseModel
-import graphviz
 import json
 import argparse
+import hashlib
 import os
+import re
+import mmap
+import pickle
+import sqlite3
+import subprocess
 import logging
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Below this many files the process pool start-up costs more than it saves
+PARALLEL_PARSE_MIN_FILES = 32
+
+# Files mentioning none of these (and not named *DTO*) are never handed to javalang
+SPRING_MARKER_RE = re.compile(rb'@(RestController|Entity|Service)')
+
+# Spring mapping annotation -> HTTP method (a bare @RequestMapping is treated as GET)
+MAPPING_TO_HTTP = {
+    'GetMapping': 'GET',
+    'PostMapping': 'POST',
+    'PutMapping': 'PUT',
+    'DeleteMapping': 'DELETE',
+    'PatchMapping': 'PATCH',
+    'RequestMapping': 'GET'
+}
+RELATIONSHIP_ANNOTATIONS = frozenset({'OneToMany', 'ManyToOne', 'OneToOne', 'ManyToMany'})
+
+# Directories never worth descending into; build output names are only pruned outside
+# src/ so that a Java package called e.g. "build" is still scanned
+SKIP_DIRS = frozenset({'.git', '.gradle', '.idea', 'node_modules'})
+BUILD_OUTPUT_DIRS = frozenset({'target', 'build', 'out'})
+
+# Bump when the pickled per-file results change shape so stale cache rows are ignored
+CACHE_VERSION = 2
+# Bump whenever extraction logic changes (what a file parses to), even if the shape does not
+PARSER_VERSION = 1
+# The parse_results version column; "2:1" stays text even in caches created with an INTEGER column
+_RESULT_VERSION = f"{CACHE_VERSION}:{PARSER_VERSION}"
+
+def dump_json(data) -> bytes:
+    """Indented JSON as UTF-8 bytes, through orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+def java_type_name(type_node) -> Optional[str]:
+    """Innermost class-like name of a javalang type: List<UserDTO> -> UserDTO, java.util.Map -> Map"""
+    if type_node is None:
+        return None
+    while getattr(type_node, 'sub_type', None) is not None:
+        type_node = type_node.sub_type
+    # Prefer the last generic argument (the value type of Map<K, V>, the element of List<E>)
+    for argument in reversed(getattr(type_node, 'arguments', None) or []):
+        inner = java_type_name(getattr(argument, 'type', None))
+        if inner:
+            return inner
+    return getattr(type_node, 'name', None)
+
+def string_literal(node) -> Optional[str]:
+    """Unquoted value of a javalang string Literal, None for any other node"""
+    value = getattr(node, 'value', None)
+    if isinstance(value, str) and len(value) >= 2 and value[0] == '"':
+        return value[1:-1]
+    return None
+
+def annotation_arguments(annotation) -> list:
+    """Arguments of a javalang Annotation; a lone value is stored bare, several as a list"""
+    element = getattr(annotation, 'element', None)
+    if element is None:
+        return []
+    return element if isinstance(element, list) else [element]
+
+def annotation_path(annotation) -> Optional[str]:
+    """Path of a mapping annotation: @GetMapping("/x") or @GetMapping(value|path = "/x")"""
+    for arg in annotation_arguments(annotation):
+        value = string_literal(arg)
+        if value is None and getattr(arg, 'name', None) in ('value', 'path'):
+            value = string_literal(arg.value)
+        if value is not None:
+            return value
+    return None
+
+def iter_java_files(root) -> Iterator[Path]:
+    """Walk root with os.scandir, yielding .java files and pruning VCS/build directories"""
+    stack = [(str(root), False)]
+    while stack:
+        dir_path, in_src = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name in SKIP_DIRS or (not in_src and entry.name in BUILD_OUTPUT_DIRS):
+                            continue
+                        stack.append((entry.path, in_src or entry.name == 'src'))
+                    elif entry.name.endswith('.java'):
+                        yield Path(entry.path)
+        except OSError as e:
+            logger.warning(f"Could not scan {dir_path}: {str(e)}")
+
 # Models
+# The parser fills these with plain strings/lists pulled from javalang nodes, so it
+# builds them with model_construct() and skips per-field validation
 class EndpointInfo(BaseModel):
     path: str
     method: str
@@ -50,77 +153,61 @@ class DependencyGraph(BaseModel):
 
 # Parser
 class JavaSpringParser:
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, max_workers: Optional[int] = None, cache_path: Optional[str] = None):
         self.base_path = Path(base_path)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache_path = cache_path
         self.endpoints: List[EndpointInfo] = []
         self.dtos: Dict[str, DtoInfo] = {}
         self.entities: Dict[str, EntityInfo] = {}
         self.services: Dict[str, ServiceInfo] = {}
+        # Filled by parse_project, so later passes over the same tree can skip the walk
+        self.java_files: List[Path] = []
 
-    def parse_java_file(self, file_path: Path) -> Optional[javalang.tree.CompilationUnit]:
+    def parse_source(self, content: str, file_path: Optional[Path] = None) -> Optional[javalang.tree.CompilationUnit]:
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
             return javalang.parse.parse(content)
         except Exception as e:
             logger.error(f"Error parsing {file_path}: {str(e)}")
             return None
 
-    def parse_controller(self, file_path: Path):
-        tree = self.parse_java_file(file_path)
-        if not tree:
-            return
+    def parse_java_file(self, file_path: Path) -> Optional[javalang.tree.CompilationUnit]:
+        try:
+            return self.parse_source(file_path.read_text(encoding='utf-8'), file_path)
+        except Exception as e:
+            logger.error(f"Error parsing {file_path}: {str(e)}")
+            return None
 
-        for class_decl in tree.types:
-            if any(ann.name == 'RestController' for ann in class_decl.annotations):
-                class_name = class_decl.name
-                base_path = ""
-                
-                for ann in class_decl.annotations:
-                    if ann.name == 'RequestMapping':
-                        if hasattr(ann, 'arguments') and ann.arguments:
-                            for arg in ann.arguments:
-                                if isinstance(arg, javalang.tree.Literal):
-                                    base_path = arg.value.strip('"')
-
-                for method in class_decl.methods:
-                    endpoint = self._parse_endpoint_method(method, class_name, base_path)
-                    if endpoint:
-                        self.endpoints.append(endpoint)
-
-    def _parse_endpoint_method(self, method, class_name: str, base_path: str) -> Optional[EndpointInfo]:
-        mapping_annotations = [
-            'GetMapping', 'PostMapping', 'PutMapping', 
-            'DeleteMapping', 'PatchMapping', 'RequestMapping'
-        ]
-        
+    def _handle_controller(self, class_decl: javalang.tree.TypeDeclaration):
+        base_path = ""
+        for ann in class_decl.annotations:
+            if ann.name == 'RequestMapping':
+                base_path = annotation_path(ann) or base_path
+
+        for method in class_decl.methods:
+            endpoint = self._parse_endpoint_method(method, class_decl.name, base_path)
+            if endpoint:
+                self.endpoints.append(endpoint)
+
+    def _parse_endpoint_method(self, method: javalang.tree.MethodDeclaration, class_name: str, base_path: str) -> Optional[EndpointInfo]:
         for ann in method.annotations:
-            if ann.name in mapping_annotations:
-                path = base_path
-                http_method = ann.name.replace('Mapping', '').upper()
-                if http_method == 'REQUEST':
-                    http_method = 'GET'
-                
-                if hasattr(ann, 'arguments') and ann.arguments:
-                    for arg in ann.arguments:
-                        if isinstance(arg, javalang.tree.Literal):
-                            path += arg.value.strip('"')
+            http_method = MAPPING_TO_HTTP.get(ann.name)
+            if http_method is not None:
+                path = base_path + (annotation_path(ann) or "")
 
                 request_dto = None
                 response_dto = None
                 
                 for param in method.parameters:
-                    if hasattr(param, 'type'):
-                        param_type = param.type.name
-                        if param_type.endswith('DTO'):
-                            request_dto = param_type
+                    param_type = java_type_name(getattr(param, 'type', None))
+                    if param_type and param_type.endswith('DTO'):
+                        request_dto = param_type
 
-                if hasattr(method.return_type, 'name'):
-                    return_type = method.return_type.name
-                    if return_type.endswith('DTO'):
-                        response_dto = return_type
+                return_type = java_type_name(method.return_type)
+                if return_type and return_type.endswith('DTO'):
+                    response_dto = return_type
 
-                return EndpointInfo(
+                return EndpointInfo.model_construct(
                     path=path,
                     method=http_method,
                     controller_class=class_name,
@@ -131,243 +218,487 @@ class JavaSpringParser:
                 )
         return None
 
-    def parse_dto(self, file_path: Path):
-        tree = self.parse_java_file(file_path)
-        if not tree:
-            return
-
-        for class_decl in tree.types:
-            if class_decl.name.endswith('DTO'):
-                fields = {}
-                for field in class_decl.fields:
-                    field_type = field.type.name
-                    for declarator in field.declarators:
-                        fields[declarator.name] = field_type
-
-                self.dtos[class_decl.name] = DtoInfo(
-                    name=class_decl.name,
-                    fields=fields,
-                    used_in_controllers=[],
-                    used_in_services=[],
-                    mapped_to_entities=[]
-                )
-
-    def parse_entity(self, file_path: Path):
-        tree = self.parse_java_file(file_path)
-        if not tree:
-            return
-
-        for class_decl in tree.types:
-            if any(ann.name == 'Entity' for ann in class_decl.annotations):
-                table_name = class_decl.name.lower()
-                for ann in class_decl.annotations:
-                    if ann.name == 'Table':
-                        if hasattr(ann, 'arguments') and ann.arguments:
-                            for arg in ann.arguments:
-                                if hasattr(arg, 'name') and arg.name == 'name' and hasattr(arg, 'value'):
-                                    table_name = arg.value.value.strip('"')
-
-                fields = {}
-                relationships = []
-
-                for field in class_decl.fields:
-                    field_type = field.type.name
-                    for declarator in field.declarators:
-                        fields[declarator.name] = field_type
-                        
-                        for ann in field.annotations:
-                            if ann.name in ['OneToMany', 'ManyToOne', 'OneToOne', 'ManyToMany']:
-                                relationships.append({
-                                    'type': ann.name,
-                                    'field': declarator.name,
-                                    'target_entity': field_type
-                                })
-
-                self.entities[class_decl.name] = EntityInfo(
-                    name=class_decl.name,
-                    table_name=table_name,
-                    fields=fields,
-                    relationships=relationships,
-                    mapped_to_dtos=[]
-                )
+    def _handle_dto(self, class_decl: javalang.tree.TypeDeclaration):
+        fields = {}
+        for field in class_decl.fields:
+            # Keep the declared type (List, not its element) for the stored field
+            field_type = field.type.name
+            for declarator in field.declarators:
+                fields[declarator.name] = field_type
+
+        self.dtos[class_decl.name] = DtoInfo.model_construct(
+            name=class_decl.name,
+            fields=fields,
+            used_in_controllers=[],
+            used_in_services=[],
+            mapped_to_entities=[]
+        )
 
-    def parse_service(self, file_path: Path):
-        tree = self.parse_java_file(file_path)
-        if not tree:
-            return
+    def _handle_entity(self, class_decl: javalang.tree.TypeDeclaration):
+        table_name = class_decl.name.lower()
+        for ann in class_decl.annotations:
+            if ann.name == 'Table':
+                for arg in annotation_arguments(ann):
+                    if getattr(arg, 'name', None) == 'name':
+                        table_name = string_literal(arg.value) or table_name
+
+        fields = {}
+        relationships = []
+
+        for field in class_decl.fields:
+            field_type = field.type.name
+            for declarator in field.declarators:
+                fields[declarator.name] = field_type
+                
+                for ann in field.annotations:
+                    if ann.name in RELATIONSHIP_ANNOTATIONS:
+                        # List<Order> orders relates to Order, not List
+                        relationships.append({
+                            'type': ann.name,
+                            'field': declarator.name,
+                            'target_entity': java_type_name(field.type)
+                        })
+
+        self.entities[class_decl.name] = EntityInfo.model_construct(
+            name=class_decl.name,
+            table_name=table_name,
+            fields=fields,
+            relationships=relationships,
+            mapped_to_dtos=[]
+        )
 
-        for class_decl in tree.types:
-            if any(ann.name == 'Service' for ann in class_decl.annotations):
-                methods = []
-                used_dtos = set()
-                used_entities = set()
+    def _handle_service(self, class_decl: javalang.tree.TypeDeclaration):
+        methods = []
+        used_dtos = set()
+        used_entities = set()
 
-                for method in class_decl.methods:
-                    methods.append(method.name)
-                    
-                    if hasattr(method.return_type, 'name'):
-                        return_type = method.return_type.name
-                        if return_type.endswith('DTO'):
-                            used_dtos.add(return_type)
-                        elif return_type in self.entities:
-                            used_entities.add(return_type)
-
-                    for param in method.parameters:
-                        if hasattr(param, 'type'):
-                            param_type = param.type.name
-                            if param_type.endswith('DTO'):
-                                used_dtos.add(param_type)
-                            elif param_type in self.entities:
-                                used_entities.add(param_type)
-
-                self.services[class_decl.name] = ServiceInfo(
-                    name=class_decl.name,
-                    methods=methods,
-                    used_dtos=list(used_dtos),
-                    used_entities=list(used_entities),
-                    called_by_controllers=[]
-                )
+        for method in class_decl.methods:
+            methods.append(method.name)
+            
+            referenced_types = [java_type_name(method.return_type)]
+            referenced_types.extend(java_type_name(getattr(param, 'type', None)) for param in method.parameters)
+            for type_name in referenced_types:
+                if not type_name:
+                    continue
+                if type_name.endswith('DTO'):
+                    used_dtos.add(type_name)
+                else:
+                    used_entities.add(type_name)
+
+        # used_entities holds every non-DTO type for now; analyze_dependencies
+        # narrows it to known entities once all files have been parsed
+        self.services[class_decl.name] = ServiceInfo.model_construct(
+            name=class_decl.name,
+            methods=methods,
+            used_dtos=list(used_dtos),
+            used_entities=list(used_entities),
+            called_by_controllers=[]
+        )
 
     def analyze_dependencies(self):
+        for service in self.services.values():
+            service.used_entities = [name for name in service.used_entities if name in self.entities]
+
         for endpoint in self.endpoints:
-            if endpoint.request_dto:
-                if endpoint.request_dto in self.dtos:
-                    self.dtos[endpoint.request_dto].used_in_controllers.append(endpoint.controller_class)
-            if endpoint.response_dto:
-                if endpoint.response_dto in self.dtos:
-                    self.dtos[endpoint.response_dto].used_in_controllers.append(endpoint.controller_class)
+            for dto_name in (endpoint.request_dto, endpoint.response_dto):
+                if dto_name in self.dtos:
+                    self.dtos[dto_name].used_in_controllers.append(endpoint.controller_class)
+
+        # Index entities by field name so each DTO only visits entities sharing a field
+        field_to_entities: Dict[str, List[str]] = defaultdict(list)
+        entity_order = {}
+        for entity_name, entity in self.entities.items():
+            entity_order[entity_name] = len(entity_order)
+            for field_name in entity.fields:
+                field_to_entities[field_name].append(entity_name)
 
         for dto_name, dto in self.dtos.items():
-            for entity_name, entity in self.entities.items():
-                matching_fields = set(dto.fields.keys()) & set(entity.fields.keys())
-                if matching_fields:
-                    dto.mapped_to_entities.append(entity_name)
-                    entity.mapped_to_dtos.append(dto_name)
+            hits = set()
+            for field_name in dto.fields:
+                hits.update(field_to_entities.get(field_name, ()))
+            for entity_name in sorted(hits, key=entity_order.__getitem__):
+                dto.mapped_to_entities.append(entity_name)
+                self.entities[entity_name].mapped_to_dtos.append(dto_name)
+
+        # A controller touching one DTO from many endpoints would otherwise be listed
+        # once per endpoint; dict.fromkeys dedupes while keeping first-seen order
+        for dto in self.dtos.values():
+            dto.used_in_controllers = list(dict.fromkeys(dto.used_in_controllers))
+            dto.mapped_to_entities = list(dict.fromkeys(dto.mapped_to_entities))
+        for entity in self.entities.values():
+            entity.mapped_to_dtos = list(dict.fromkeys(entity.mapped_to_dtos))
+
+    def _visit(self, tree: javalang.tree.CompilationUnit):
+        """Classify each top-level type once and hand it to every matching extractor"""
+        for class_decl in tree.types:
+            # One malformed type should not throw away the rest of the file
+            try:
+                ann_names = {ann.name for ann in class_decl.annotations}
+                if 'RestController' in ann_names:
+                    self._handle_controller(class_decl)
+                if 'Entity' in ann_names:
+                    self._handle_entity(class_decl)
+                if 'Service' in ann_names:
+                    self._handle_service(class_decl)
+                if class_decl.name.endswith('DTO'):
+                    self._handle_dto(class_decl)
+            except Exception as e:
+                logger.error(f"Error processing type {getattr(class_decl, 'name', '?')}: {str(e)}")
+
+    def _should_parse(self, content: bytes, file_path: Path) -> bool:
+        return 'DTO' in file_path.name or SPRING_MARKER_RE.search(content) is not None
+
+    def parse_file(self, file_path: Path):
+        try:
+            # Sniff the raw bytes through mmap and only decode files we route somewhere
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if not self._should_parse(mm, file_path):
+                        return
+                    content = mm[:].decode('utf-8')
+
+            tree = self.parse_source(content, file_path)
+            if tree:
+                self._visit(tree)
+        except Exception as e:
+            logger.error(f"Error processing file {file_path}: {str(e)}")
 
     def parse_project(self) -> DependencyGraph:
-        for file_path in self.base_path.rglob("*.java"):
+        java_files = self.java_files = list(iter_java_files(self.base_path))
+        cache = None
+        if self.cache_path:
             try:
-                content = file_path.read_text(encoding='utf-8')
-                
-                if '@RestController' in content:
-                    self.parse_controller(file_path)
-                elif '@Entity' in content:
-                    self.parse_entity(file_path)
-                elif 'DTO' in file_path.name:
-                    self.parse_dto(file_path)
-                elif '@Service' in content:
-                    self.parse_service(file_path)
-            except Exception as e:
-                logger.error(f"Error processing file {file_path}: {str(e)}")
-                continue
+                cache = ParseCache(self.cache_path)
+            except sqlite3.Error as e:
+                logger.warning(f"Parse cache {self.cache_path} unavailable, parsing without it: {str(e)}")
+
+        try:
+            stats = [_stat_for_cache(file_path) if cache else None for file_path in java_files]
+            lookups = [cache.get(file_path, st) if st is not None else (None, None) for file_path, st in zip(java_files, stats)]
+            results = [result for result, _ in lookups]
+            missing = [i for i, result in enumerate(results) if result is None]
+            missing_files = [java_files[i] for i in missing]
+            if cache:
+                logger.info(f"Parse cache: {len(java_files) - len(missing)} hits, {len(missing)} misses")
+
+            if self.max_workers == 1 or len(missing_files) < PARALLEL_PARSE_MIN_FILES:
+                parsed = [_parse_file(file_path) for file_path in missing_files]
+            else:
+                # Files are independent until analyze_dependencies, so parse them in
+                # worker processes (javalang is pure Python and holds the GIL)
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    parsed = list(executor.map(_parse_file, missing_files, chunksize=8))
+
+            for i, result in zip(missing, parsed):
+                results[i] = result
+                if stats[i] is not None:
+                    cache.put(java_files[i], stats[i], lookups[i][1], result)
+        finally:
+            if cache:
+                cache.close()
+
+        # Merge in walk order so cached and fresh runs produce identical graphs
+        for endpoints, dtos, entities, services in results:
+            self.endpoints.extend(endpoints)
+            self.dtos.update(dtos)
+            self.entities.update(entities)
+            self.services.update(services)
 
         self.analyze_dependencies()
 
-        return DependencyGraph(
+        return DependencyGraph.model_construct(
             endpoints=self.endpoints,
             dtos=self.dtos,
             entities=self.entities,
             services=self.services
         )
 
+def _parse_file(file_path: Path) -> Tuple[List[EndpointInfo], Dict[str, DtoInfo], Dict[str, EntityInfo], Dict[str, ServiceInfo]]:
+    """Parse a single Java file into partial results (module level so worker processes can pickle it)"""
+    parser = JavaSpringParser(str(file_path.parent), max_workers=1)
+    parser.parse_file(file_path)
+    return parser.endpoints, parser.dtos, parser.entities, parser.services
+
+def _stat_for_cache(file_path: Path) -> Optional[os.stat_result]:
+    """Stat a file for the parse cache; a file that vanished since the walk is just a miss"""
+    try:
+        return file_path.stat()
+    except OSError as e:
+        logger.warning(f"Could not stat {file_path}, parsing it uncached: {str(e)}")
+        return None
+
+class ParseCache:
+    """sqlite cache of pickled per-file parse results, content addressed.
+
+    parse_files maps a path to its last seen (mtime, size, digest), so unchanged files are
+    hits without being read. When the stat differs (a fresh clone, a checkout touching the
+    file) the bytes are hashed and parse_results is consulted by digest, so identical
+    content is still never parsed twice, in any repository.
+
+    Several processes may share one cache file, so the connection autocommits (no write
+    lock is held while files are parsed) and any sqlite error just counts as a miss.
+    """
+
+    def __init__(self, db_path: str):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        try:
+            # WAL lets readers proceed while another process writes
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.Error as e:
+            logger.warning(f"Parse cache {db_path} stays in rollback journal mode: {str(e)}")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS parse_files ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, digest TEXT)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS parse_results ("
+            "digest TEXT, version TEXT, blob BLOB, PRIMARY KEY (digest, version))"
+        )
+
+    @staticmethod
+    def _digest(file_path: Path) -> str:
+        # The file name is part of the key: *DTO* files are parsed even without Spring markers
+        h = hashlib.sha1(file_path.name.encode('utf-8'))
+        h.update(file_path.read_bytes())
+        return h.hexdigest()
+
+    def _load(self, digest: str) -> Optional[tuple]:
+        row = self.conn.execute(
+            "SELECT blob FROM parse_results WHERE digest = ? AND version = ?", (digest, _RESULT_VERSION)
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            return pickle.loads(row[0])
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {digest}: {str(e)}")
+            return None
+
+    def get(self, file_path: Path, st: os.stat_result) -> Tuple[Optional[tuple], Optional[str]]:
+        """(cached result or None, content digest when it had to be computed)"""
+        try:
+            return self._get(file_path, st)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Parse cache lookup failed for {file_path}, parsing it: {str(e)}")
+            return None, None
+
+    def _get(self, file_path: Path, st: os.stat_result) -> Tuple[Optional[tuple], Optional[str]]:
+        path = str(file_path.resolve())
+        row = self.conn.execute(
+            "SELECT digest FROM parse_files WHERE path = ? AND mtime_ns = ? AND size = ?",
+            (path, st.st_mtime_ns, st.st_size)
+        ).fetchone()
+        if row is not None:
+            result = self._load(row[0])
+            if result is not None:
+                return result, None
+
+        digest = self._digest(file_path)
+        result = self._load(digest)
+        if result is not None:
+            self._remember(path, st, digest)
+        return result, digest
+
+    def put(self, file_path: Path, st: os.stat_result, digest: Optional[str], result: tuple):
+        try:
+            digest = digest or self._digest(file_path)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO parse_results (digest, version, blob) VALUES (?, ?, ?)",
+                (digest, _RESULT_VERSION, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+            )
+            self._remember(str(file_path.resolve()), st, digest)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Could not cache parse result for {file_path}: {str(e)}")
+
+    def _remember(self, path: str, st: os.stat_result, digest: str):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO parse_files (path, mtime_ns, size, digest) VALUES (?, ?, ?, ?)",
+            (path, st.st_mtime_ns, st.st_size, digest)
+        )
+
+    def close(self):
+        try:
+            self.conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Error closing parse cache: {str(e)}")
+
 # Visualizer
+_DOT_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n'})
+
+def _dot_quote(value) -> str:
+    return '"' + str(value).translate(_DOT_ESCAPES) + '"'
+
+def _dot_attrs(attrs: Dict[str, str]) -> str:
+    return ' '.join(f"{key}={_dot_quote(value)}" for key, value in attrs.items())
+
+def _dot_label(lines) -> str:
+    """Quoted multi-line label, joined with DOT's own \\n escape"""
+    return '"' + '\\n'.join(str(line).translate(_DOT_ESCAPES) for line in lines) + '"'
+
+def _dot_node(node_id: str, label: str, **attrs) -> str:
+    return _dot_labeled_node(node_id, _dot_quote(label), **attrs)
+
+def _dot_labeled_node(node_id: str, quoted_label: str, **attrs) -> str:
+    return f"{_dot_quote(node_id)} [label={quoted_label} {_dot_attrs(attrs)}]"
+
+def _dot_edge(tail: str, head: str, label: str, **attrs) -> str:
+    return f"{_dot_quote(tail)} -> {_dot_quote(head)} [{_dot_attrs({'label': label, **attrs})}]"
+
+def _dot_cluster(body: List[str], edges: List[str], name: str, label: str, statements: List[str]):
+    body.extend(f"\t{edge}" for edge in edges)
+    body.append(f"\tsubgraph {name} {{")
+    body.append(f"\t\tlabel={_dot_quote(label)}")
+    body.extend(f"\t\t{statement}" for statement in statements)
+    body.append("\t}")
+
 class DependencyVisualizer:
     def __init__(self, dependency_graph: DependencyGraph, service_calls: List[Dict] = None):
         self.graph = dependency_graph
         self.service_calls = service_calls or []
-        self.dot = graphviz.Digraph(comment='API Dependencies')
-        self.dot.attr(rankdir='LR')
+        self._body: List[str] = []
+
+        # Reverse indexes so each get_impact_analysis call is a dict lookup, not a scan
+        self._dto_to_endpoints: Dict[str, List[EndpointInfo]] = defaultdict(list)
+        for endpoint in dependency_graph.endpoints:
+            if endpoint.request_dto:
+                self._dto_to_endpoints[endpoint.request_dto].append(endpoint)
+            if endpoint.response_dto and endpoint.response_dto != endpoint.request_dto:
+                self._dto_to_endpoints[endpoint.response_dto].append(endpoint)
+
+        self._dto_to_services: Dict[str, List[str]] = defaultdict(list)
+        for service_name, service in dependency_graph.services.items():
+            for used_dto in service.used_dtos:
+                self._dto_to_services[used_dto].append(service_name)
+
+        # Node labels are built once, already quoted for DOT
+        self._dto_labels = {
+            name: _dot_label([name, *(f"{k}: {v}" for k, v in dto.fields.items())])
+            for name, dto in dependency_graph.dtos.items()
+        }
+        self._entity_labels = {
+            name: _dot_label([name, f"({entity.table_name})", *(f"{k}: {v}" for k, v in entity.fields.items())])
+            for name, entity in dependency_graph.entities.items()
+        }
+        self._service_labels = {
+            name: _dot_label([name, *service.methods])
+            for name, service in dependency_graph.services.items()
+        }
+
+    @property
+    def source(self) -> str:
+        """DOT source for the graph built by create_graph"""
+        lines = ['// API Dependencies', 'digraph {', '\trankdir=LR']
+        lines.extend(self._body)
+        lines.append('}')
+        return '\n'.join(lines) + '\n'
 
     def create_graph(self):
         try:
-            self.dot.attr('node', shape='rectangle', style='rounded')
+            # DOT text is written straight into self._body; top-level edges of a
+            # section are emitted ahead of its cluster, matching the old Digraph layout
+            body = ['\tnode [shape=rectangle style=rounded]']
             
             # Create subgraph for service calls if any exist
             if self.service_calls:
-                with self.dot.subgraph(name='cluster_service_calls') as c:
-                    c.attr(label='Service Calls')
-                    for call in self.service_calls:
-                        source_id = f"service_{call['source_service']}"
-                        target_id = f"service_{call['target_service']}"
-                        
-                        # Create service nodes if they don't exist
-                        c.node(source_id, call['source_service'], color='purple')
-                        c.node(target_id, call['target_service'], color='purple')
-                        
-                        # Create edge with call details
-                        edge_label = f"{call['http_method']} {call['path']}\n"
-                        if call['has_fallback']:
-                            edge_label += "(with fallback)"
-                        
-                        c.edge(source_id, target_id, edge_label, color='purple', style='bold')
-                        
-                        # Add DTO connections if present
-                        if call.get('request_dto'):
-                            c.edge(source_id, f"dto_{call['request_dto']}", 'sends', style='dashed')
-                        if call.get('response_dto'):
-                            c.edge(target_id, f"dto_{call['response_dto']}", 'returns', style='dashed')
-            
-            with self.dot.subgraph(name='cluster_endpoints') as c:
-                c.attr(label='API Endpoints')
-                for endpoint in self.graph.endpoints:
-                    node_id = f"endpoint_{endpoint.path}_{endpoint.method}"
-                    label = f"{endpoint.method}\n{endpoint.path}"
-                    c.node(node_id, label, color='blue')
+                cluster = []
+                for call in self.service_calls:
+                    source_id = f"service_{call['source_service']}"
+                    target_id = f"service_{call['target_service']}"
                     
-                    if endpoint.request_dto:
-                        self.dot.edge(node_id, f"dto_{endpoint.request_dto}", 'uses')
-                    if endpoint.response_dto:
-                        self.dot.edge(node_id, f"dto_{endpoint.response_dto}", 'returns')
-            
-            with self.dot.subgraph(name='cluster_dtos') as c:
-                c.attr(label='DTOs')
-                for dto_name, dto in self.graph.dtos.items():
-                    label = f"{dto_name}\n" + "\n".join(f"{k}: {v}" for k, v in dto.fields.items())
-                    c.node(f"dto_{dto_name}", label, color='green')
+                    # Create service nodes if they don't exist
+                    cluster.append(_dot_node(source_id, call['source_service'], color='purple'))
+                    cluster.append(_dot_node(target_id, call['target_service'], color='purple'))
                     
-                    for entity in dto.mapped_to_entities:
-                        self.dot.edge(f"dto_{dto_name}", f"entity_{entity}", 'maps to')
-            
-            with self.dot.subgraph(name='cluster_entities') as c:
-                c.attr(label='Database Entities')
-                for entity_name, entity in self.graph.entities.items():
-                    label = f"{entity_name}\n({entity.table_name})\n" + "\n".join(f"{k}: {v}" for k, v in entity.fields.items())
-                    c.node(f"entity_{entity_name}", label, color='red')
+                    # Create edge with call details
+                    edge_label = f"{call['http_method']} {call['path']}\n"
+                    if call['has_fallback']:
+                        edge_label += "(with fallback)"
                     
-                    for rel in entity.relationships:
-                        self.dot.edge(
-                            f"entity_{entity_name}",
-                            f"entity_{rel['target_entity']}",
-                            rel['type']
-                        )
-            
-            with self.dot.subgraph(name='cluster_services') as c:
-                c.attr(label='Services')
-                for service_name, service in self.graph.services.items():
-                    label = f"{service_name}\n" + "\n".join(service.methods)
-                    c.node(f"service_{service_name}", label, color='orange')
+                    cluster.append(_dot_edge(source_id, target_id, edge_label, color='purple', style='bold'))
                     
-                    for dto in service.used_dtos:
-                        self.dot.edge(f"service_{service_name}", f"dto_{dto}", 'uses')
-                    for entity in service.used_entities:
-                        self.dot.edge(f"service_{service_name}", f"entity_{entity}", 'uses')
+                    # Add DTO connections if present
+                    if call.get('request_dto'):
+                        cluster.append(_dot_edge(source_id, f"dto_{call['request_dto']}", 'sends', style='dashed'))
+                    if call.get('response_dto'):
+                        cluster.append(_dot_edge(target_id, f"dto_{call['response_dto']}", 'returns', style='dashed'))
+                _dot_cluster(body, [], 'cluster_service_calls', 'Service Calls', cluster)
+            
+            edges, cluster = [], []
+            for endpoint in self.graph.endpoints:
+                node_id = f"endpoint_{endpoint.path}_{endpoint.method}"
+                label = f"{endpoint.method}\n{endpoint.path}"
+                cluster.append(_dot_node(node_id, label, color='blue'))
+                
+                if endpoint.request_dto:
+                    edges.append(_dot_edge(node_id, f"dto_{endpoint.request_dto}", 'uses'))
+                if endpoint.response_dto:
+                    edges.append(_dot_edge(node_id, f"dto_{endpoint.response_dto}", 'returns'))
+            _dot_cluster(body, edges, 'cluster_endpoints', 'API Endpoints', cluster)
+            
+            edges, cluster = [], []
+            for dto_name, dto in self.graph.dtos.items():
+                cluster.append(_dot_labeled_node(f"dto_{dto_name}", self._dto_labels[dto_name], color='green'))
+                
+                for entity in dto.mapped_to_entities:
+                    edges.append(_dot_edge(f"dto_{dto_name}", f"entity_{entity}", 'maps to'))
+            _dot_cluster(body, edges, 'cluster_dtos', 'DTOs', cluster)
+            
+            edges, cluster = [], []
+            for entity_name, entity in self.graph.entities.items():
+                cluster.append(_dot_labeled_node(f"entity_{entity_name}", self._entity_labels[entity_name], color='red'))
+                
+                for rel in entity.relationships:
+                    edges.append(_dot_edge(
+                        f"entity_{entity_name}",
+                        f"entity_{rel['target_entity']}",
+                        rel['type']
+                    ))
+            _dot_cluster(body, edges, 'cluster_entities', 'Database Entities', cluster)
+            
+            edges, cluster = [], []
+            for service_name, service in self.graph.services.items():
+                cluster.append(_dot_labeled_node(f"service_{service_name}", self._service_labels[service_name], color='orange'))
+                
+                for dto in service.used_dtos:
+                    edges.append(_dot_edge(f"service_{service_name}", f"dto_{dto}", 'uses'))
+                for entity in service.used_entities:
+                    edges.append(_dot_edge(f"service_{service_name}", f"entity_{entity}", 'uses'))
+            _dot_cluster(body, edges, 'cluster_services', 'Services', cluster)
+
+            self._body = body
         except Exception as e:
             logger.error(f"Error creating graph: {str(e)}")
             raise
     
     def save(self, output_path: str, format: str = 'png'):
+        self.save_many(output_path, [format])
+
+    def save_many(self, output_path: str, formats: List[str]):
+        """Render every format from one dot process, so the graph is laid out only once"""
         try:
             # Ensure the output directory exists
             output_dir = os.path.dirname(output_path)
             if output_dir:
                 os.makedirs(output_dir, exist_ok=True)
             
-            # Try to render the graph
-            self.dot.render(output_path, format=format, cleanup=True)
+            # Pipe the DOT source straight into Graphviz; each -T/-o pair adds an output
+            command = ['dot']
+            for fmt in formats:
+                command += [f'-T{fmt}', '-o', f'{output_path}.{fmt}']
+            subprocess.run(command, input=self.source, text=True, capture_output=True, check=True)
+        except FileNotFoundError as e:
+            logger.error(f"Failed to save visualization: {str(e)}")
+            logger.error("Graphviz 'dot' executable not found. Please install Graphviz and ensure it's in your system PATH.")
+            raise
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Failed to save visualization: {e.stderr.strip()}")
+            raise
         except Exception as e:
             logger.error(f"Failed to save visualization: {str(e)}")
-            if "failed to execute" in str(e) and "dot" in str(e):
-                logger.error("Graphviz 'dot' executable not found. Please install Graphviz and ensure it's in your system PATH.")
             raise
     
     def get_impact_analysis(self, dto_name: str) -> Dict[str, any]:
@@ -376,15 +707,8 @@ class DependencyVisualizer:
             
         dto = self.graph.dtos[dto_name]
         
-        affected_endpoints = [
-            endpoint for endpoint in self.graph.endpoints
-            if endpoint.request_dto == dto_name or endpoint.response_dto == dto_name
-        ]
-        
-        affected_services = [
-            service_name for service_name, service in self.graph.services.items()
-            if dto_name in service.used_dtos
-        ]
+        affected_endpoints = self._dto_to_endpoints.get(dto_name, [])
+        affected_services = list(self._dto_to_services.get(dto_name, []))
         
         affected_tables = []
         for entity_name in dto.mapped_to_entities:
@@ -401,33 +725,48 @@ class DependencyVisualizer:
             "field_mappings": dto.fields
         }
 
-def main():
+def build_arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description='Analyze Java Spring Boot microservices dependencies')
     parser.add_argument('project_path', help='Path to the Java Spring Boot project')
     parser.add_argument('--output', '-o', default='dependencies',
                        help='Output path for visualization (default: dependencies)')
-    parser.add_argument('--format', '-f', choices=['png', 'pdf', 'svg'],
-                       default='png', help='Output format (default: png)')
+    # append rather than nargs='+' so "-f svg <project_path>" doesn't swallow the path
+    parser.add_argument('--format', '-f', choices=['png', 'pdf', 'svg'], action='append',
+                       help='Output format, repeat for several (-f svg -f pdf; default: png)')
     parser.add_argument('--analyze-dto', '-d',
                        help='Analyze impact of changes to specific DTO')
-    
-    args = parser.parse_args()
+    parser.add_argument('--json', '-j', dest='json_output',
+                       help='Also write the full dependency graph as JSON to this path')
+    parser.add_argument('--cache', dest='cache_path',
+                       help='sqlite file for caching per-file parse results between runs')
+    return parser
+
+def main():
+    args = build_arg_parser().parse_args()
+    # Not an argparse default: append would add to it instead of replacing it
+    args.format = args.format or ['png']
     
     try:
-        java_parser = JavaSpringParser(args.project_path)
+        java_parser = JavaSpringParser(args.project_path, cache_path=args.cache_path)
         dependency_graph = java_parser.parse_project()
         visualizer = DependencyVisualizer(dependency_graph)
+
+        if args.json_output:
+            with open(args.json_output, 'wb') as f:
+                f.write(dump_json(dependency_graph.model_dump()))
+            logger.info(f"Dependency graph JSON saved to: {args.json_output}")
         
         if args.analyze_dto:
             impact_analysis = visualizer.get_impact_analysis(args.analyze_dto)
             print("\nImpact Analysis:")
-            print(json.dumps(impact_analysis, indent=2))
+            print(dump_json(impact_analysis).decode('utf-8'))
         else:
             try:
                 visualizer.create_graph()
                 output_path = Path(args.output)
-                visualizer.save(str(output_path), args.format)
-                logger.info(f"Dependency graph saved to: {output_path}.{args.format}")
+                visualizer.save_many(str(output_path), args.format)
+                for fmt in args.format:
+                    logger.info(f"Dependency graph saved to: {output_path}.{fmt}")
             except Exception as e:
                 logger.warning("Could not generate visualization (Graphviz may not be installed). Continuing with analysis...")
             
@@ -1,8 +1,11 @@
 from dataclasses import dataclass
-from typing import List, Optional, Dict
+from typing import Iterable, List, Optional, Dict, Tuple
 import javalang
 import logging
+import mmap
+import os
 from pathlib import Path
+from analyze import iter_java_files, java_type_name, string_literal, annotation_arguments, annotation_path
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,6 +26,14 @@ class FeignClientInfo:
     fallback_class: Optional[str]
     methods: List[FeignMethod]
 
+def _file_contains(file_path: Path, marker: bytes) -> bool:
+    """Check for a byte marker via mmap without decoding the file"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm.find(marker) != -1
+
 class FeignClientParser:
     def __init__(self, service_mapping_manager):
         self.service_mapping_manager = service_mapping_manager
@@ -34,6 +45,14 @@ class FeignClientParser:
             'PatchMapping': 'PATCH',
             'RequestMapping': 'GET'  # Default method for RequestMapping
         }
+        self._resolve_cache: Dict[Tuple[str, str], Optional[str]] = {}
+
+    def _resolve_property(self, repo_key: str, placeholder: str) -> Optional[str]:
+        """Resolve a ${...} placeholder once per (repo, placeholder); clients often share keys"""
+        cache_key = (repo_key, placeholder)
+        if cache_key not in self._resolve_cache:
+            self._resolve_cache[cache_key] = self.service_mapping_manager.resolve_property(repo_key, placeholder)
+        return self._resolve_cache[cache_key]
 
     def parse_feign_client(self, file_path: str, repo_path: str) -> Optional[FeignClientInfo]:
         try:
@@ -60,18 +79,20 @@ class FeignClientParser:
                 url_value = None
                 fallback_class = None
                 
-                if hasattr(feign_client_annotation, 'arguments'):
-                    for arg in feign_client_annotation.arguments:
-                        if isinstance(arg, javalang.tree.ElementValuePair):
-                            if arg.name == 'value' or arg.name == 'name':
-                                target_service = arg.value.value.strip('"')
-                            elif arg.name == 'url':
-                                url_value = arg.value.value.strip('"')
-                            elif arg.name == 'fallback':
-                                fallback_class = arg.value.member
-                        elif isinstance(arg, javalang.tree.Literal):
-                            # If no name is specified, the first string argument is the name
-                            target_service = arg.value.strip('"')
+                for arg in annotation_arguments(feign_client_annotation):
+                    literal = string_literal(arg)
+                    # A bare constant (@FeignClient(Names.ORDER)) is a MemberReference, not an ElementValuePair
+                    name = getattr(arg, 'name', None)
+                    if literal is not None:
+                        # If no name is specified, the first string argument is the name
+                        target_service = literal
+                    elif name == 'value' or name == 'name':
+                        target_service = string_literal(arg.value)
+                    elif name == 'url':
+                        url_value = string_literal(arg.value)
+                    elif name == 'fallback':
+                        # fallback = SomeFallback.class is a ClassReference to that type
+                        fallback_class = java_type_name(getattr(arg.value, 'type', None))
                 
                 # Parse methods
                 methods: List[FeignMethod] = []
@@ -83,7 +104,7 @@ class FeignClientParser:
                 # If url contains property placeholder, try to resolve it
                 if url_value and '${' in url_value:
                     repo_key = Path(repo_path).name
-                    resolved_url = self.service_mapping_manager.resolve_property(repo_key, url_value)
+                    resolved_url = self._resolve_property(repo_key, url_value)
                     if resolved_url:
                         url_value = resolved_url
                 
@@ -110,13 +131,7 @@ class FeignClientParser:
                     http_method = self.http_method_annotations[ann.name]
                     
                     # Extract path from annotation
-                    if hasattr(ann, 'arguments'):
-                        for arg in ann.arguments:
-                            if isinstance(arg, javalang.tree.ElementValuePair):
-                                if arg.name in ['value', 'path']:
-                                    path = arg.value.value.strip('"')
-                            elif isinstance(arg, javalang.tree.Literal):
-                                path = arg.value.strip('"')
+                    path = annotation_path(ann) or ""
                     break
             
             if not http_method:
@@ -128,16 +143,14 @@ class FeignClientParser:
             
             # Check parameters for request DTO
             for param in method_declaration.parameters:
-                if hasattr(param, 'type'):
-                    param_type = param.type.name
-                    if param_type.endswith('DTO'):
-                        request_dto = param_type
+                param_type = java_type_name(getattr(param, 'type', None))
+                if param_type and param_type.endswith('DTO'):
+                    request_dto = param_type
             
             # Check return type for response DTO
-            if hasattr(method_declaration.return_type, 'name'):
-                return_type = method_declaration.return_type.name
-                if return_type.endswith('DTO'):
-                    response_dto = return_type
+            return_type = java_type_name(method_declaration.return_type)
+            if return_type and return_type.endswith('DTO'):
+                response_dto = return_type
             
             return FeignMethod(
                 name=method_declaration.name,
@@ -151,17 +164,18 @@ class FeignClientParser:
             logger.error(f"Error parsing Feign method {method_declaration.name}: {str(e)}")
             return None
 
-    def extract_service_calls(self, repo_path: str) -> List[Dict]:
-        """Extract all Feign client service calls from a repository"""
+    def extract_service_calls(self, repo_path: str, java_files: Optional[Iterable[Path]] = None) -> List[Dict]:
+        """Extract all Feign client service calls from a repository; pass java_files to reuse an earlier walk"""
         service_calls = []
         
         try:
-            for java_file in Path(repo_path).rglob("*.java"):
-                if "@FeignClient" in java_file.read_text(encoding='utf-8'):
+            source_service = self.service_mapping_manager.get_service_name(repo_path)
+            if java_files is None:
+                java_files = iter_java_files(repo_path)
+            for java_file in java_files:
+                if _file_contains(java_file, b"@FeignClient"):
                     feign_client = self.parse_feign_client(str(java_file), repo_path)
                     if feign_client:
-                        source_service = self.service_mapping_manager.get_service_name(repo_path)
-                        
                         for method in feign_client.methods:
                             service_calls.append({
                                 'source_service': source_service,
@@ -1,328 +1,656 @@
-from neo4j import GraphDatabase
-from typing import Dict, List, Optional
+from neo4j import GraphDatabase, Query, READ_ACCESS, WRITE_ACCESS, unit_of_work
+from typing import Dict, Iterator, List, Optional
+import hashlib
+import json
 import logging
 
+logger = logging.getLogger(__name__)
+
+# Records pulled per Bolt round-trip when streaming read results
+STREAM_FETCH_SIZE = 10000
+# Server-side bound on any single read, so a pathological graph cannot hang the caller
+READ_TIMEOUT_SECONDS = 30
+# Repositories fetched per get_all_repositories query
+REPOSITORY_PAGE_SIZE = 100
+
+# Node properties are only written when their content_hash differs, so re-ingesting
+# an unchanged repository does not rewrite (and log) every property again.
+# Cypher is kept in module constants so every call sends identical query text
+# and the server can reuse its cached plan
+_REPOSITORY_MERGE = """
+    MERGE (r:Repository {name: $repo_name})
+    RETURN elementId(r) AS repo_id
+"""
+
+_REPOSITORY_MARK_INGESTED = """
+    MATCH (r:Repository {name: $repo_name})
+    SET r.head_sha = $head_sha, r.ingested_at = timestamp()
+"""
+
+_REPOSITORY_HEAD_SHAS_QUERY = """
+    MATCH (r:Repository)
+    WHERE r.head_sha IS NOT NULL
+    RETURN r.name AS repo_name, r.head_sha AS head_sha
+"""
+
+# Keyed on service_name (the unique constraint) so renaming or moving a service updates it in place
+_SERVICE_DEFINITION_MERGE = """
+    MATCH (r) WHERE elementId(r) = $repo_id
+    MERGE (sd:ServiceDefinition {service_name: $service_name})
+    SET sd.repository_name = $repo_name,
+        sd.friendly_name = $friendly_name,
+        sd.base_path = $base_path
+    MERGE (r)-[:DEFINES]->(sd)
+"""
+
+_CONTROLLER_NAMES_MERGE = "UNWIND $names AS name MERGE (:Controller {name: name})"
+_DTO_NAMES_MERGE = "UNWIND $names AS name MERGE (:DTO {name: name})"
+_ENTITY_NAMES_MERGE = "UNWIND $names AS name MERGE (:Entity {name: name})"
+
+_ENDPOINTS_MERGE = """
+    MATCH (r) WHERE elementId(r) = $repo_id
+    UNWIND $rows AS ep
+    MERGE (e:Endpoint {unique_id: ep.unique_id})
+    CALL {
+        WITH e, ep
+        WITH e, ep WHERE e.content_hash IS NULL OR e.content_hash <> ep.content_hash
+        SET e += ep.props, e.content_hash = ep.content_hash
+    }
+    MERGE (e)-[:BELONGS_TO]->(r)
+"""
+
+# Optional DTO links are sent only for the rows that have one (split in Python),
+# rather than every row going through a FOREACH over a CASE-built list
+_ENDPOINT_REQUEST_DTO_LINK = """
+    UNWIND $rows AS row
+    MATCH (e:Endpoint {unique_id: row.unique_id})
+    MATCH (d:DTO {name: row.dto})
+    MERGE (e)-[:USES_REQUEST_DTO]->(d)
+"""
+
+_ENDPOINT_RESPONSE_DTO_LINK = """
+    UNWIND $rows AS row
+    MATCH (e:Endpoint {unique_id: row.unique_id})
+    MATCH (d:DTO {name: row.dto})
+    MERGE (e)-[:RETURNS_RESPONSE_DTO]->(d)
+"""
+
+# Inner lists go through unit CALL subqueries, so an empty list does not drop the row;
+# referenced nodes already exist (_merge_referenced_nodes) and are only matched
+_DTOS_MERGE = """
+    MATCH (r) WHERE elementId(r) = $repo_id
+    UNWIND $rows AS row
+    MATCH (d:DTO {name: row.name})
+    CALL {
+        WITH d, row
+        WITH d, row WHERE d.content_hash IS NULL OR d.content_hash <> row.content_hash
+        SET d += row.props, d.content_hash = row.content_hash
+        REMOVE d.fields
+    }
+    MERGE (d)-[:BELONGS_TO]->(r)
+    CALL {
+        WITH d, row
+        UNWIND row.used_in_controllers AS controller
+        MATCH (c:Controller {name: controller})
+        MERGE (d)-[:USED_IN]->(c)
+    }
+    CALL {
+        WITH d, row
+        UNWIND row.mapped_to_entities AS entity
+        MATCH (e:Entity {name: entity})
+        MERGE (d)-[:MAPS_TO]->(e)
+    }
+"""
+
+_ENTITIES_MERGE = """
+    MATCH (r) WHERE elementId(r) = $repo_id
+    UNWIND $rows AS row
+    MATCH (e:Entity {name: row.name})
+    CALL {
+        WITH e, row
+        WITH e, row WHERE e.content_hash IS NULL OR e.content_hash <> row.content_hash
+        SET e += row.props, e.content_hash = row.content_hash
+        REMOVE e.fields
+    }
+    MERGE (e)-[:BELONGS_TO]->(r)
+    CALL {
+        WITH e, row
+        UNWIND row.relationships AS rel
+        MATCH (target:Entity {name: rel.target_entity})
+        MERGE (e)-[:RELATES_TO {
+            type: rel.type,
+            field: rel.field
+        }]->(target)
+    }
+"""
+
+_SERVICES_MERGE = """
+    MATCH (r) WHERE elementId(r) = $repo_id
+    UNWIND $rows AS row
+    MERGE (s:Service {name: row.name})
+    CALL {
+        WITH s, row
+        WITH s, row WHERE s.content_hash IS NULL OR s.content_hash <> row.content_hash
+        SET s += row.props, s.content_hash = row.content_hash
+    }
+    MERGE (s)-[:BELONGS_TO]->(r)
+    CALL {
+        WITH s, row
+        UNWIND row.used_dtos AS dto_name
+        MATCH (d:DTO {name: dto_name})
+        MERGE (s)-[:USES_DTO]->(d)
+    }
+    CALL {
+        WITH s, row
+        UNWIND row.used_entities AS entity_name
+        MATCH (e:Entity {name: entity_name})
+        MERGE (s)-[:USES_ENTITY]->(e)
+    }
+"""
+
+_IMPACT_ANALYSIS_QUERY = """
+    MATCH (d:DTO {name: $dto_name})
+    OPTIONAL MATCH (d)<-[:USES_REQUEST_DTO|RETURNS_RESPONSE_DTO]-(e:Endpoint)
+    OPTIONAL MATCH (d)<-[:USES_DTO]-(s:Service)
+    OPTIONAL MATCH (d)-[:MAPS_TO]->(entity:Entity)
+    RETURN {
+        dto: d.name,
+        affected_endpoints: collect(DISTINCT {
+            method: e.method,
+            path: e.path
+        }),
+        affected_services: collect(DISTINCT s.name),
+        affected_tables: collect(DISTINCT entity.table_name),
+        field_names: d.field_names,
+        field_types: d.field_types
+    } as impact
+"""
+
+_IMPACT_ANALYSIS_BULK_QUERY = """
+    UNWIND $dto_names AS dto_name
+    MATCH (d:DTO {name: dto_name})
+    CALL {
+        WITH d
+        MATCH (d)<-[:USES_REQUEST_DTO|RETURNS_RESPONSE_DTO]-(e:Endpoint)
+        RETURN collect(DISTINCT {method: e.method, path: e.path}) AS affected_endpoints
+    }
+    CALL {
+        WITH d
+        MATCH (d)<-[:USES_DTO]-(s:Service)
+        RETURN collect(DISTINCT s.name) AS affected_services
+    }
+    CALL {
+        WITH d
+        MATCH (d)-[:MAPS_TO]->(entity:Entity)
+        RETURN collect(DISTINCT entity.table_name) AS affected_tables
+    }
+    RETURN d.name AS name, {
+        dto: d.name,
+        affected_endpoints: affected_endpoints,
+        affected_services: affected_services,
+        affected_tables: affected_tables,
+        field_names: d.field_names,
+        field_types: d.field_types
+    } as impact
+"""
+
+_CROSS_SERVICE_DEPENDENCIES_QUERY = """
+    MATCH (r1:Repository)-[:CONTAINS]->(s1:Service)-[:USES_DTO]->(d:DTO)<-[:USES_DTO]-(s2:Service)<-[:CONTAINS]-(r2:Repository)
+    WHERE r1 <> r2
+    RETURN {
+        from_repo: r1.name,
+        from_service: s1.name,
+        dto: d.name,
+        to_service: s2.name,
+        to_repo: r2.name
+    } as dependency
+"""
+
+_REPOSITORY_DTO_NAMES_QUERY = """
+    MATCH (r:Repository)<-[:BELONGS_TO]-(d:DTO)
+    RETURN r.name AS repo_name, d.name AS dto_name
+    ORDER BY repo_name
+"""
+
+_ALL_REPOSITORIES_QUERY = """
+    MATCH (r:Repository)
+    WITH r ORDER BY r.name SKIP $skip LIMIT $limit
+    // One subquery per kind, so each collects on its own instead of
+    // over the endpoints x dtos x entities x services cross product
+    CALL {
+        WITH r
+        MATCH (r)<-[:BELONGS_TO]-(e:Endpoint)
+        RETURN collect({
+            path: e.path,
+            method: e.method,
+            controller_class: e.controller_class,
+            method_name: e.method_name,
+            request_dto: e.request_dto,
+            response_dto: e.response_dto
+        }) as endpoints
+    }
+    CALL {
+        WITH r
+        MATCH (r)<-[:BELONGS_TO]-(d:DTO)
+        RETURN collect({
+            name: d.name,
+            field_names: d.field_names,
+            field_types: d.field_types,
+            used_in_controllers: [],
+            mapped_to_entities: []
+        }) as dtos
+    }
+    CALL {
+        WITH r
+        MATCH (r)<-[:BELONGS_TO]-(en:Entity)
+        RETURN collect({
+            name: en.name,
+            table_name: en.table_name,
+            field_names: en.field_names,
+            field_types: en.field_types,
+            relationships: []
+        }) as entities
+    }
+    CALL {
+        WITH r
+        MATCH (r)<-[:BELONGS_TO]-(s:Service)
+        RETURN collect({
+            name: s.name,
+            methods: s.methods,
+            used_dtos: [],
+            used_entities: []
+        }) as services
+    }
+    RETURN r.name as repo_name, {
+        endpoints: endpoints,
+        dtos: dtos,
+        entities: entities,
+        services: services
+    } as repo_data
+"""
+
+_SERVICE_CALLS_MERGE = """
+    MATCH (r:Repository {name: $repo_name})
+    UNWIND $rows AS call
+    MATCH (sd1:ServiceDefinition {service_name: call.source_service})
+    MATCH (sd2:ServiceDefinition {service_name: call.target_service})
+    MERGE (sc:ServiceCall {unique_id: call.unique_id})
+    SET sc.interface_name = call.interface_name,
+        sc.method_name = call.method_name,
+        sc.http_method = call.http_method,
+        sc.path = call.path,
+        sc.url_value = call.url_value,
+        sc.has_fallback = call.has_fallback
+    MERGE (sc)-[:BELONGS_TO]->(r)
+    MERGE (sd1)-[:CALLS]->(sc)
+    MERGE (sc)-[:TARGETS]->(sd2)
+"""
+
+_SERVICE_CALL_REQUEST_DTO_LINK = """
+    UNWIND $rows AS row
+    MATCH (sc:ServiceCall {unique_id: row.unique_id})
+    MATCH (d:DTO {name: row.dto})
+    MERGE (sc)-[:USES_REQUEST_DTO]->(d)
+"""
+
+_SERVICE_CALL_RESPONSE_DTO_LINK = """
+    UNWIND $rows AS row
+    MATCH (sc:ServiceCall {unique_id: row.unique_id})
+    MATCH (d:DTO {name: row.dto})
+    MERGE (sc)-[:RETURNS_RESPONSE_DTO]->(d)
+"""
+
+_SERVICE_CALL_GRAPH_QUERY = """
+    MATCH (sd1:ServiceDefinition)-[:CALLS]->(sc:ServiceCall)-[:TARGETS]->(sd2:ServiceDefinition)
+    OPTIONAL MATCH (sc)-[:USES_REQUEST_DTO]->(req:DTO)
+    OPTIONAL MATCH (sc)-[:RETURNS_RESPONSE_DTO]->(resp:DTO)
+    RETURN {
+        source_service: {
+            name: sd1.service_name,
+            friendly_name: sd1.friendly_name
+        },
+        target_service: {
+            name: sd2.service_name,
+            friendly_name: sd2.friendly_name
+        },
+        call_details: {
+            interface: sc.interface_name,
+            method: sc.method_name,
+            http_method: sc.http_method,
+            path: sc.path,
+            request_dto: req.name,
+            response_dto: resp.name,
+            has_fallback: sc.has_fallback
+        }
+    } as service_call
+"""
+
+def _content_hash(props: Dict) -> str:
+    """Stable digest of a node's stored properties"""
+    return hashlib.sha1(json.dumps(props, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def _with_props(row: Dict, props: Dict) -> Dict:
+    row['props'] = props
+    row['content_hash'] = _content_hash(props)
+    return row
+
+def _dto_links(rows: List[Dict], dto_key: str) -> List[Dict]:
+    """(unique_id, dto) pairs for the rows that reference a DTO under dto_key"""
+    return [{'unique_id': row['unique_id'], 'dto': row[dto_key]} for row in rows if row.get(dto_key)]
+
+def _service_call_rows(service_calls: List[Dict]) -> List[Dict]:
+    return [{
+        **call,
+        'unique_id': f"{call['source_service']}_{call['interface_name']}_{call['method_name']}"
+    } for call in service_calls]
+
+def _impact_with_field_mappings(impact: Dict) -> Dict:
+    """Rebuild the name -> type field map from the parallel arrays stored on the DTO"""
+    impact = dict(impact)
+    impact["field_mappings"] = dict(zip(impact.pop("field_names") or [], impact.pop("field_types") or []))
+    return impact
+
+@unit_of_work(timeout=READ_TIMEOUT_SECONDS)
+def _read_records(tx, query: str, params: Dict) -> list:
+    return list(tx.run(query, **params))
+
 class Neo4jStore:
-    def __init__(self, uri: str, username: str, password: str):
-        self.driver = GraphDatabase.driver(uri, auth=(username, password))
+    def __init__(self, uri: str, username: str, password: str,
+                 max_connection_pool_size: int = 64,
+                 connection_acquisition_timeout: float = 60.0,
+                 max_connection_lifetime: float = 3600.0,
+                 fetch_size: int = 1000,
+                 database: str = 'neo4j'):
+        # Naming the database on every session saves the home-database lookup
+        self.database = database
+        self.driver = GraphDatabase.driver(
+            uri,
+            auth=(username, password),
+            max_connection_pool_size=max_connection_pool_size,
+            connection_acquisition_timeout=connection_acquisition_timeout,
+            max_connection_lifetime=max_connection_lifetime,
+            keep_alive=True,
+            fetch_size=fetch_size
+        )
         self._init_constraints()
 
+    def _session(self, access_mode: str = WRITE_ACCESS, **kwargs):
+        return self.driver.session(database=self.database, default_access_mode=access_mode, **kwargs)
+
     def _init_constraints(self):
-        with self.driver.session() as session:
-            # Create constraints for unique identifiers
-            constraints = [
-                "CREATE CONSTRAINT endpoint_id IF NOT EXISTS FOR (e:Endpoint) REQUIRE e.unique_id IS UNIQUE",
-                "CREATE CONSTRAINT dto_name IF NOT EXISTS FOR (d:DTO) REQUIRE d.name IS UNIQUE",
-                "CREATE CONSTRAINT entity_name IF NOT EXISTS FOR (e:Entity) REQUIRE e.name IS UNIQUE",
-                "CREATE CONSTRAINT service_name IF NOT EXISTS FOR (s:Service) REQUIRE s.name IS UNIQUE",
-                "CREATE CONSTRAINT repository_name IF NOT EXISTS FOR (r:Repository) REQUIRE r.name IS UNIQUE",
-                "CREATE CONSTRAINT service_call_id IF NOT EXISTS FOR (sc:ServiceCall) REQUIRE sc.unique_id IS UNIQUE",
-                "CREATE CONSTRAINT service_definition_name IF NOT EXISTS FOR (sd:ServiceDefinition) REQUIRE sd.service_name IS UNIQUE"
-            ]
-            for constraint in constraints:
-                try:
-                    session.run(constraint)
-                except Exception as e:
-                    logging.warning(f"Constraint creation failed: {str(e)}")
-
-    def store_repository_data(self, repo_name: str, friendly_name: str, service_name: str, base_path: str, dependency_data: Dict):
-        logging.info(f"Storing data for repository: {repo_name}")
-        logging.info(f"Data to store: {dependency_data}")
-        
-        try:
-            with self.driver.session() as session:
-                # Create repository and service definition nodes
-                session.run("""
-                    MERGE (r:Repository {name: $repo_name})
-                    MERGE (sd:ServiceDefinition {
-                        repository_name: $repo_name,
-                        friendly_name: $friendly_name,
-                        service_name: $service_name,
-                        base_path: $base_path
-                    })
-                    MERGE (r)-[:DEFINES]->(sd)
-                """, repo_name=repo_name, friendly_name=friendly_name,
-                     service_name=service_name, base_path=base_path)
-                logging.info("Created repository and service definition nodes")
-
-                # Store endpoints
-                logging.info("Storing endpoints...")
-                for endpoint in dependency_data.get('endpoints', []):
-                    try:
-                        self._store_endpoint(session, repo_name, endpoint)
-                        logging.info(f"Stored endpoint: {endpoint.get('path')}")
-                    except Exception as e:
-                        logging.error(f"Error storing endpoint: {str(e)}")
+        # Create constraints for unique identifiers
+        constraints = [
+            "CREATE CONSTRAINT endpoint_id IF NOT EXISTS FOR (e:Endpoint) REQUIRE e.unique_id IS UNIQUE",
+            "CREATE CONSTRAINT dto_name IF NOT EXISTS FOR (d:DTO) REQUIRE d.name IS UNIQUE",
+            "CREATE CONSTRAINT entity_name IF NOT EXISTS FOR (e:Entity) REQUIRE e.name IS UNIQUE",
+            "CREATE CONSTRAINT service_name IF NOT EXISTS FOR (s:Service) REQUIRE s.name IS UNIQUE",
+            "CREATE CONSTRAINT repository_name IF NOT EXISTS FOR (r:Repository) REQUIRE r.name IS UNIQUE",
+            "CREATE CONSTRAINT service_call_id IF NOT EXISTS FOR (sc:ServiceCall) REQUIRE sc.unique_id IS UNIQUE",
+            "CREATE CONSTRAINT service_definition_name IF NOT EXISTS FOR (sd:ServiceDefinition) REQUIRE sd.service_name IS UNIQUE",
+            "CREATE CONSTRAINT controller_name IF NOT EXISTS FOR (c:Controller) REQUIRE c.name IS UNIQUE"
+        ]
+        # Lookup indexes for read queries (unique constraints above already index their keys)
+        indexes = [
+            "CREATE INDEX endpoint_method_path IF NOT EXISTS FOR (e:Endpoint) ON (e.method, e.path)",
+            "CREATE INDEX service_definition_friendly_name IF NOT EXISTS FOR (sd:ServiceDefinition) ON (sd.friendly_name)"
+        ]
+        statements = constraints + indexes
 
-                # Store DTOs
-                logging.info("Storing DTOs...")
-                for dto_name, dto_info in dependency_data.get('dtos', {}).items():
+        with self._session() as session:
+            try:
+                # All schema statements in one transaction, committed once
+                session.execute_write(self._run_schema, statements)
+            except Exception as e:
+                # One bad statement aborts the batch; apply the rest individually
+                logger.warning(f"Batched schema creation failed, retrying one by one: {str(e)}")
+                for statement in statements:
                     try:
-                        self._store_dto(session, repo_name, dto_name, dto_info)
-                        logging.info(f"Stored DTO: {dto_name}")
+                        session.run(statement)
                     except Exception as e:
-                        logging.error(f"Error storing DTO: {str(e)}")
+                        logger.warning(f"Schema statement failed: {str(e)}")
 
-                # Store entities
-                logging.info("Storing entities...")
-                for entity_name, entity_info in dependency_data.get('entities', {}).items():
-                    try:
-                        self._store_entity(session, repo_name, entity_name, entity_info)
-                        logging.info(f"Stored entity: {entity_name}")
-                    except Exception as e:
-                        logging.error(f"Error storing entity: {str(e)}")
+    @staticmethod
+    def _run_schema(tx, statements: List[str]):
+        for statement in statements:
+            tx.run(statement)
 
-                # Store services
-                logging.info("Storing services...")
-                for service_name, service_info in dependency_data.get('services', {}).items():
-                    try:
-                        self._store_service(session, repo_name, service_name, service_info)
-                        logging.info(f"Stored service: {service_name}")
-                    except Exception as e:
-                        logging.error(f"Error storing service: {str(e)}")
-                
-                logging.info("Completed storing repository data")
+    def store_repository_data(self, repo_name: str, friendly_name: Optional[str] = None, service_name: Optional[str] = None,
+                              base_path: Optional[str] = None, dependency_data: Optional[Dict] = None,
+                              service_calls: Optional[List[Dict]] = None, head_sha: Optional[str] = None):
+        """Store a repository's dependency graph; its ServiceDefinition is only written when service_name is known.
+
+        service_calls and head_sha, when given, are written in the same transaction, so a
+        repository is only marked ingested at head_sha together with all of its data.
+        """
+        dependency_data = dependency_data or {}
+        logger.info(f"Storing data for repository: {repo_name}")
+        if logger.isEnabledFor(logging.DEBUG):
+            # Formatting the whole payload is expensive on large repositories
+            logger.debug(f"Data to store: {dependency_data}")
+        
+        try:
+            # All writes share one transaction (one commit) and are retried together on transient errors
+            with self._session() as session:
+                session.execute_write(self._ingest_all, repo_name, friendly_name, service_name, base_path,
+                                      dependency_data, _service_call_rows(service_calls or []), head_sha)
+            logger.info("Completed storing repository data")
         except Exception as e:
-            logging.error(f"Error storing repository data: {str(e)}")
+            logger.error(f"Error storing repository data: {str(e)}")
             raise
 
-    def _store_endpoint(self, session, repo_name: str, endpoint: Dict):
-        session.run("""
-            MATCH (r:Repository {name: $repo_name})
-            MERGE (e:Endpoint {
-                path: $path,
-                method: $method,
-                controller_class: $controller_class,
-                method_name: $method_name,
-                repository: $repo_name,
-                unique_id: $repo_name + '_' + $controller_class + '_' + $method_name
-            })
-            MERGE (e)-[:BELONGS_TO]->(r)
-            WITH e
-            FOREACH (dto_name IN CASE WHEN $request_dto IS NOT NULL 
-                    THEN [$request_dto] ELSE [] END |
-                MERGE (d:DTO {name: dto_name})
-                MERGE (e)-[:USES_REQUEST_DTO]->(d))
-            FOREACH (dto_name IN CASE WHEN $response_dto IS NOT NULL 
-                    THEN [$response_dto] ELSE [] END |
-                MERGE (d:DTO {name: dto_name})
-                MERGE (e)-[:RETURNS_RESPONSE_DTO]->(d))
-        """, repo_name=repo_name, **endpoint)
-
-    def _store_dto(self, session, repo_name: str, dto_name: str, dto_info: Dict):
-        # Convert fields to a string representation
-        fields_str = ','.join([f"{k}:{v}" for k, v in dto_info.get('fields', {}).items()])
-        
-        session.run("""
-            MATCH (r:Repository {name: $repo_name})
-            MERGE (d:DTO {name: $dto_name})
-            SET d.fields = $fields_str
-            MERGE (d)-[:BELONGS_TO]->(r)
-            WITH d
-            UNWIND $used_in_controllers AS controller
-            MERGE (c:Controller {name: controller})
-            MERGE (d)-[:USED_IN]->(c)
-            WITH d
-            UNWIND $mapped_to_entities AS entity
-            MERGE (e:Entity {name: entity})
-            MERGE (d)-[:MAPS_TO]->(e)
-        """, repo_name=repo_name, dto_name=dto_name, fields_str=fields_str,
-             used_in_controllers=dto_info.get('used_in_controllers', []),
-             mapped_to_entities=dto_info.get('mapped_to_entities', []))
-
-    def _store_entity(self, session, repo_name: str, entity_name: str, entity_info: Dict):
-        # Convert fields to a string representation
-        fields_str = ','.join([f"{k}:{v}" for k, v in entity_info.get('fields', {}).items()])
-        
-        session.run("""
-            MATCH (r:Repository {name: $repo_name})
-            MERGE (e:Entity {name: $entity_name})
-            SET e.table_name = $table_name,
-                e.fields = $fields_str
-            MERGE (e)-[:BELONGS_TO]->(r)
-            WITH e
-            UNWIND $relationships AS rel
-            MERGE (target:Entity {name: rel.target_entity})
-            MERGE (e)-[:RELATES_TO {
-                type: rel.type,
-                field: rel.field
-            }]->(target)
-        """, repo_name=repo_name, entity_name=entity_name,
-             table_name=entity_info.get('table_name'),
-             fields_str=fields_str,
-             relationships=entity_info.get('relationships', []))
-
-    def _store_service(self, session, repo_name: str, service_name: str, service_info: Dict):
-        session.run("""
-            MATCH (r:Repository {name: $repo_name})
-            MERGE (s:Service {name: $service_name})
-            SET s.methods = $methods
-            MERGE (s)-[:BELONGS_TO]->(r)
-            WITH s
-            UNWIND $used_dtos AS dto_name
-            MERGE (d:DTO {name: dto_name})
-            MERGE (s)-[:USES_DTO {methods: $methods}]->(d)
-            WITH s
-            UNWIND $used_entities AS entity_name
-            MERGE (e:Entity {name: entity_name})
-            MERGE (s)-[:USES_ENTITY {methods: $methods}]->(e)
-        """, repo_name=repo_name, service_name=service_name,
-             methods=service_info.get('methods', []),
-             used_dtos=service_info.get('used_dtos', []),
-             used_entities=service_info.get('used_entities', []))
+    def _ingest_all(self, tx, repo_name: str, friendly_name: Optional[str], service_name: Optional[str],
+                    base_path: Optional[str], dependency_data: Dict, service_call_rows: List[Dict],
+                    head_sha: Optional[str]):
+        # Create the repository node; the writes below find it again by element id
+        # instead of an index lookup
+        repo_id = tx.run(_REPOSITORY_MERGE, repo_name=repo_name).single()["repo_id"]
+        if service_name is not None:
+            tx.run(_SERVICE_DEFINITION_MERGE, repo_id=repo_id, repo_name=repo_name, friendly_name=friendly_name,
+                   service_name=service_name, base_path=base_path)
+            logger.info("Created repository and service definition nodes")
+        else:
+            logger.info("Created repository node (no service mapping, skipping service definition)")
+
+        endpoints = dependency_data.get('endpoints', [])
+        dtos = dependency_data.get('dtos', {})
+        entities = dependency_data.get('entities', {})
+        services = dependency_data.get('services', {})
+        self._merge_referenced_nodes(tx, endpoints, dtos, entities, services)
+
+        # Store each kind of node with one UNWIND query instead of one query per item
+        for label, store, items in (
+            ('endpoints', self._store_endpoints_bulk, endpoints),
+            ('DTOs', self._store_dtos_bulk, dtos),
+            ('entities', self._store_entities_bulk, entities),
+            ('services', self._store_services_bulk, services),
+        ):
+            store(tx, repo_id, repo_name, items)
+            logger.info(f"Stored {len(items)} {label}")
+
+        if service_call_rows:
+            self._store_service_calls_bulk(tx, repo_name, service_call_rows)
+            logger.info(f"Stored {len(service_call_rows)} service calls")
+        if head_sha:
+            self._mark_ingested(tx, repo_name, head_sha)
+
+    def _merge_referenced_nodes(self, tx, endpoints: List[Dict], dtos: Dict[str, Dict],
+                                entities: Dict[str, Dict], services: Dict[str, Dict]):
+        """MERGE every Controller/DTO/Entity name once, so the bulk writes can MATCH them"""
+        controller_names = {c for dto in dtos.values() for c in dto.get('used_in_controllers', [])}
+        dto_names = set(dtos)
+        dto_names.update(name for ep in endpoints for name in (ep.get('request_dto'), ep.get('response_dto')) if name)
+        dto_names.update(name for service in services.values() for name in service.get('used_dtos', []))
+        entity_names = set(entities)
+        entity_names.update(name for dto in dtos.values() for name in dto.get('mapped_to_entities', []))
+        entity_names.update(rel['target_entity'] for entity in entities.values()
+                            for rel in entity.get('relationships', []) if rel.get('target_entity'))
+        entity_names.update(name for service in services.values() for name in service.get('used_entities', []))
+
+        tx.run(_CONTROLLER_NAMES_MERGE, names=sorted(controller_names))
+        tx.run(_DTO_NAMES_MERGE, names=sorted(dto_names))
+        tx.run(_ENTITY_NAMES_MERGE, names=sorted(entity_names))
+
+    def _store_endpoints_bulk(self, tx, repo_id: str, repo_name: str, endpoints: List[Dict]):
+        # The key is built here so the MERGE is a plain seek on the unique_id constraint
+        rows = [_with_props({
+            'unique_id': f"{repo_name}_{endpoint['controller_class']}_{endpoint['method_name']}",
+            'request_dto': endpoint.get('request_dto'),
+            'response_dto': endpoint.get('response_dto')
+        }, {
+            'path': endpoint.get('path'),
+            'method': endpoint.get('method'),
+            'controller_class': endpoint['controller_class'],
+            'method_name': endpoint['method_name'],
+            'repository': repo_name,
+            'request_dto': endpoint.get('request_dto'),
+            'response_dto': endpoint.get('response_dto')
+        }) for endpoint in endpoints]
+
+        tx.run(_ENDPOINTS_MERGE, repo_id=repo_id, rows=rows)
+        self._link_dtos(tx, rows, _ENDPOINT_REQUEST_DTO_LINK, _ENDPOINT_RESPONSE_DTO_LINK)
+
+    @staticmethod
+    def _link_dtos(tx, rows: List[Dict], request_query: str, response_query: str):
+        for query, dto_key in ((request_query, 'request_dto'), (response_query, 'response_dto')):
+            links = _dto_links(rows, dto_key)
+            if links:
+                tx.run(query, rows=links)
+
+    def _store_dtos_bulk(self, tx, repo_id: str, repo_name: str, dtos: Dict[str, Dict]):
+        rows = [_with_props({
+            'name': dto_name,
+            'used_in_controllers': dto_info.get('used_in_controllers', []),
+            'mapped_to_entities': dto_info.get('mapped_to_entities', [])
+        }, {
+            # Fields are stored as parallel name/type arrays rather than a flattened string
+            'field_names': list(dto_info.get('fields', {}).keys()),
+            'field_types': [str(v) for v in dto_info.get('fields', {}).values()]
+        }) for dto_name, dto_info in dtos.items()]
+
+        tx.run(_DTOS_MERGE, repo_id=repo_id, rows=rows)
+
+    def _store_entities_bulk(self, tx, repo_id: str, repo_name: str, entities: Dict[str, Dict]):
+        rows = [_with_props({
+            'name': entity_name,
+            'relationships': entity_info.get('relationships', [])
+        }, {
+            'table_name': entity_info.get('table_name'),
+            # Fields are stored as parallel name/type arrays rather than a flattened string
+            'field_names': list(entity_info.get('fields', {}).keys()),
+            'field_types': [str(v) for v in entity_info.get('fields', {}).values()]
+        }) for entity_name, entity_info in entities.items()]
+
+        tx.run(_ENTITIES_MERGE, repo_id=repo_id, rows=rows)
+
+    def _store_services_bulk(self, tx, repo_id: str, repo_name: str, services: Dict[str, Dict]):
+        rows = [_with_props({
+            'name': service_name,
+            'used_dtos': service_info.get('used_dtos', []),
+            'used_entities': service_info.get('used_entities', [])
+        }, {
+            'methods': service_info.get('methods', [])
+        }) for service_name, service_info in services.items()]
+
+        tx.run(_SERVICES_MERGE, repo_id=repo_id, rows=rows)
+
+    def _read(self, query: str, **params) -> list:
+        """Run a read query in a retried, time-limited read transaction and return its records"""
+        with self._session(READ_ACCESS) as session:
+            return session.execute_read(_read_records, query, params)
 
     def get_impact_analysis(self, dto_name: str) -> Dict:
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (d:DTO {name: $dto_name})
-                OPTIONAL MATCH (d)<-[:USES_REQUEST_DTO|RETURNS_RESPONSE_DTO]-(e:Endpoint)
-                OPTIONAL MATCH (d)<-[:USES_DTO]-(s:Service)
-                OPTIONAL MATCH (d)-[:MAPS_TO]->(entity:Entity)
-                RETURN {
-                    dto: d.name,
-                    affected_endpoints: collect(DISTINCT {
-                        method: e.method,
-                        path: e.path
-                    }),
-                    affected_services: collect(DISTINCT s.name),
-                    affected_tables: collect(DISTINCT entity.table_name),
-                    field_mappings: d.fields
-                } as impact
-            """, dto_name=dto_name)
-            
-            return result.single()["impact"]
+        records = self._read(_IMPACT_ANALYSIS_QUERY, dto_name=dto_name)
+
+        return _impact_with_field_mappings(records[0]["impact"])
+
+    def get_impact_analysis_bulk(self, dto_names: List[str]) -> Dict[str, Dict]:
+        """Impact analysis for many DTOs in one query, keyed by DTO name; unknown names are left out"""
+        if not dto_names:
+            return {}
+        records = self._read(_IMPACT_ANALYSIS_BULK_QUERY, dto_names=list(set(dto_names)))
+        return {record["name"]: _impact_with_field_mappings(record["impact"]) for record in records}
+
+    def _stream(self, query: str, key: str, **params) -> Iterator[Dict]:
+        """Yield one column of a read query as records arrive, instead of buffering the whole result"""
+        with self._session(READ_ACCESS, fetch_size=STREAM_FETCH_SIZE) as session:
+            for record in session.run(Query(query, timeout=READ_TIMEOUT_SECONDS), **params):
+                yield record[key]
+
+    def iter_cross_service_dependencies(self) -> Iterator[Dict]:
+        return self._stream(_CROSS_SERVICE_DEPENDENCIES_QUERY, "dependency")
 
     def get_cross_service_dependencies(self) -> List[Dict]:
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (r1:Repository)-[:CONTAINS]->(s1:Service)-[:USES_DTO]->(d:DTO)<-[:USES_DTO]-(s2:Service)<-[:CONTAINS]-(r2:Repository)
-                WHERE r1 <> r2
-                RETURN {
-                    from_repo: r1.name,
-                    from_service: s1.name,
-                    dto: d.name,
-                    to_service: s2.name,
-                    to_repo: r2.name
-                } as dependency
-            """)
-            
-            return [record["dependency"] for record in result]
-
-    def get_all_repositories(self):
-        """Get all repositories and their data from Neo4j."""
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (r:Repository)
-                OPTIONAL MATCH (r)<-[:BELONGS_TO]-(e:Endpoint)
-                OPTIONAL MATCH (r)<-[:BELONGS_TO]-(d:DTO)
-                OPTIONAL MATCH (r)<-[:BELONGS_TO]-(en:Entity)
-                OPTIONAL MATCH (r)<-[:BELONGS_TO]-(s:Service)
-                WITH r,
-                     collect(DISTINCT {
-                         path: e.path,
-                         method: e.method,
-                         controller_class: e.controller_class,
-                         method_name: e.method_name,
-                         request_dto: e.request_dto,
-                         response_dto: e.response_dto
-                     }) as endpoints,
-                     collect(DISTINCT {
-                         name: d.name,
-                         fields: d.fields,
-                         used_in_controllers: [],
-                         mapped_to_entities: []
-                     }) as dtos,
-                     collect(DISTINCT {
-                         name: en.name,
-                         table_name: en.table_name,
-                         fields: en.fields,
-                         relationships: []
-                     }) as entities,
-                     collect(DISTINCT {
-                         name: s.name,
-                         methods: s.methods,
-                         used_dtos: [],
-                         used_entities: []
-                     }) as services
-                RETURN r.name as repo_name, {
-                    endpoints: endpoints,
-                    dtos: dtos,
-                    entities: entities,
-                    services: services
-                } as repo_data
-            """)
-            return [(record["repo_name"], record["repo_data"]) for record in result]
+        return list(self.iter_cross_service_dependencies())
+
+    def get_all_repositories(self, page: Optional[int] = None, page_size: int = REPOSITORY_PAGE_SIZE):
+        """Get all repositories and their data from Neo4j, or just one page of them when page is given."""
+        if page is not None:
+            return self._repository_page(page * page_size, page_size)
+
+        return list(self.iter_repositories(page_size))
+
+    def iter_repositories(self, page_size: int = REPOSITORY_PAGE_SIZE) -> Iterator[tuple]:
+        """Yield (repo_name, repo_data) page by page, so at most one page is held at a time"""
+        # Fetch page by page so no single query has to build every repository's data at once
+        skip = 0
+        while True:
+            batch = self._repository_page(skip, page_size)
+            yield from batch
+            if len(batch) < page_size:
+                return
+            skip += page_size
+
+    def get_repository_dto_names(self) -> List[tuple]:
+        """(repo_name, dto_name) for every DTO, without loading the rest of each repository"""
+        records = self._read(_REPOSITORY_DTO_NAMES_QUERY)
+        return [(record["repo_name"], record["dto_name"]) for record in records]
+
+    def _repository_page(self, skip: int, limit: int):
+        records = self._read(_ALL_REPOSITORIES_QUERY, skip=skip, limit=limit)
+        return [(record["repo_name"], record["repo_data"]) for record in records]
+
+    def get_repository_head_shas(self) -> Dict[str, str]:
+        """Commit SHA each repository was last fully ingested at"""
+        records = self._read(_REPOSITORY_HEAD_SHAS_QUERY)
+        return {record["repo_name"]: record["head_sha"] for record in records}
+
+    @staticmethod
+    def _mark_ingested(tx, repo_name: str, head_sha: str):
+        """Record the commit a repository's data now reflects"""
+        tx.run(_REPOSITORY_MARK_INGESTED, repo_name=repo_name, head_sha=head_sha)
 
     def store_service_calls(self, repo_name: str, service_calls: List[Dict]):
         """Store service calls detected from FeignClients"""
-        logging.info(f"Storing service calls for repository: {repo_name}")
+        logger.info(f"Storing service calls for repository: {repo_name}")
         
+        rows = _service_call_rows(service_calls)
+
         try:
-            with self.driver.session() as session:
-                for call in service_calls:
-                    unique_id = f"{call['source_service']}_{call['interface_name']}_{call['method_name']}"
-                    session.run("""
-                        MATCH (r:Repository {name: $repo_name})
-                        MATCH (sd1:ServiceDefinition {service_name: $source_service})
-                        MATCH (sd2:ServiceDefinition {service_name: $target_service})
-                        MERGE (sc:ServiceCall {
-                            unique_id: $unique_id,
-                            interface_name: $interface_name,
-                            method_name: $method_name,
-                            http_method: $http_method,
-                            path: $path,
-                            url_value: $url_value,
-                            has_fallback: $has_fallback
-                        })
-                        MERGE (sc)-[:BELONGS_TO]->(r)
-                        MERGE (sd1)-[:CALLS]->(sc)
-                        MERGE (sc)-[:TARGETS]->(sd2)
-                        WITH sc
-                        FOREACH (dto_name IN CASE WHEN $request_dto IS NOT NULL 
-                                THEN [$request_dto] ELSE [] END |
-                            MERGE (d:DTO {name: dto_name})
-                            MERGE (sc)-[:USES_REQUEST_DTO]->(d))
-                        FOREACH (dto_name IN CASE WHEN $response_dto IS NOT NULL 
-                                THEN [$response_dto] ELSE [] END |
-                            MERGE (d:DTO {name: dto_name})
-                            MERGE (sc)-[:RETURNS_RESPONSE_DTO]->(d))
-                    """, repo_name=repo_name, unique_id=unique_id, **call)
-                    
-                logging.info(f"Stored {len(service_calls)} service calls")
-                
+            with self._session() as session:
+                session.execute_write(self._store_service_calls_bulk, repo_name, rows)
+            logger.info(f"Stored {len(service_calls)} service calls")
         except Exception as e:
-            logging.error(f"Error storing service calls: {str(e)}")
+            logger.error(f"Error storing service calls: {str(e)}")
             raise
 
-    def get_service_call_graph(self) -> Dict:
+    def _store_service_calls_bulk(self, tx, repo_name: str, rows: List[Dict]):
+        tx.run(_SERVICE_CALLS_MERGE, repo_name=repo_name, rows=rows)
+        # The same DTO is usually sent or returned by many calls; MERGE each name once, then MATCH it per row
+        dto_names = {row[key] for row in rows for key in ('request_dto', 'response_dto') if row.get(key)}
+        tx.run(_DTO_NAMES_MERGE, names=sorted(dto_names))
+        self._link_dtos(tx, rows, _SERVICE_CALL_REQUEST_DTO_LINK, _SERVICE_CALL_RESPONSE_DTO_LINK)
+
+    def iter_service_call_graph(self) -> Iterator[Dict]:
+        """Stream the service call graph one call at a time"""
+        return self._stream(_SERVICE_CALL_GRAPH_QUERY, "service_call")
+
+    def get_service_call_graph(self) -> List[Dict]:
         """Get a complete graph of service calls"""
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (sd1:ServiceDefinition)-[:CALLS]->(sc:ServiceCall)-[:TARGETS]->(sd2:ServiceDefinition)
-                OPTIONAL MATCH (sc)-[:USES_REQUEST_DTO]->(req:DTO)
-                OPTIONAL MATCH (sc)-[:RETURNS_RESPONSE_DTO]->(resp:DTO)
-                RETURN {
-                    source_service: {
-                        name: sd1.service_name,
-                        friendly_name: sd1.friendly_name
-                    },
-                    target_service: {
-                        name: sd2.service_name,
-                        friendly_name: sd2.friendly_name
-                    },
-                    call_details: {
-                        interface: sc.interface_name,
-                        method: sc.method_name,
-                        http_method: sc.http_method,
-                        path: sc.path,
-                        request_dto: req.name,
-                        response_dto: resp.name,
-                        has_fallback: sc.has_fallback
-                    }
-                } as service_call
-            """)
-            
-            return [record["service_call"] for record in result]
+        return list(self.iter_service_call_graph())
 
     def close(self):
+        """Close the driver; safe to call more than once"""
+        if self.driver is None:
+            return
         self.driver.close()
+        self.driver = None
@@ -1,46 +1,83 @@
 import os
 import git
-import shutil
+import itertools
+import queue
 import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict
-import json
+from typing import List, Dict, Iterator, Optional, Tuple
 from neo4j_store import Neo4jStore
-from analyze import JavaSpringParser
-from service_mapping import ServiceMappingManager
+from analyze import JavaSpringParser, DependencyVisualizer, dump_json
+from service_mapping import RepositoryEntry, ServiceMappingManager
 from feign_client_parser import FeignClientParser
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class RepositoryProcessor:
-    def __init__(self, neo4j_uri: str, neo4j_user: str, neo4j_password: str):
-        self.neo4j_store = Neo4jStore(neo4j_uri, neo4j_user, neo4j_password)
-        self.service_mapping_manager = ServiceMappingManager()
-        self.repos_dir = Path("repos")
-        self.repos_dir.mkdir(exist_ok=True)
-        
-        # Get Git credentials from environment
-        self.git_username = os.getenv('GIT_USERNAME')
-        self.git_password = os.getenv('GIT_PASSWORD')
-        
-        # Load service mappings
-        self.service_mapping_manager.load_from_repositories_file('repositories.txt')
+@dataclass
+class CollectedRepository:
+    repo_name: str
+    friendly_name: str
+    service_name: str
+    base_path: str
+    graph_dict: Dict
+    service_calls: List[Dict]
+    head_sha: Optional[str] = None
 
-    def process_local_directory(self, dir_path: str):
-        """Process a local directory containing the service code."""
+class RepositoryCollector:
+    """Clones and parses repositories without touching Neo4j, so it can run in worker processes"""
+
+    def __init__(self, service_mapping_manager: ServiceMappingManager, repos_dir: Path,
+                 git_username: Optional[str] = None, git_password: Optional[str] = None,
+                 parse_cache_path: Optional[str] = None, parser_workers: Optional[int] = None,
+                 generate_graphs: bool = True, ingested_shas: Optional[Dict[str, str]] = None):
+        self.service_mapping_manager = service_mapping_manager
+        self.repos_dir = repos_dir
+        self.git_username = git_username
+        self.git_password = git_password
+        self.parse_cache_path = parse_cache_path
+        self.parser_workers = parser_workers
+        self.generate_graphs = generate_graphs
+        # repo name -> commit SHA already in Neo4j; repositories still at that commit are skipped
+        self.ingested_shas = ingested_shas or {}
+
+    def collect_entry(self, entry: RepositoryEntry) -> Optional[CollectedRepository]:
+        """Collect one repositories.txt entry: a local directory with mapping columns, or a Git URL"""
+        parts = entry.parts
+        if len(parts) < 4:
+            return self.collect_repository(entry.line)
+
+        # Convert Windows paths to proper format
+        dir_path = os.path.normpath(parts[0])
+        logger.info(f"Processing directory: {dir_path}")
+        logger.info(f"Full entry: {entry.line}")
+
+        # Check if directory exists
+        if not os.path.exists(dir_path):
+            logger.error(f"Directory not found: {dir_path}")
+            logger.error(f"Current working directory: {os.getcwd()}")
+            return None
+        logger.info(f"Directory exists at: {dir_path}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Contents: {os.listdir(dir_path)}")
+        return self.collect_local_directory(dir_path)
+
+    def collect_local_directory(self, dir_path: str) -> Optional[CollectedRepository]:
+        """Parse a local directory containing the service code."""
         try:
             # Get repository name and service mapping info
             repo_name = os.path.basename(dir_path.rstrip(os.sep))
             logger.info(f"Looking up service mapping for repo: {repo_name}")
             logger.info(f"Full directory path: {dir_path}")
-            logger.info(f"Directory exists: {os.path.exists(dir_path)}")
-            if os.path.exists(dir_path):
-                logger.info(f"Directory contents: {os.listdir(dir_path)}")
+            if logger.isEnabledFor(logging.DEBUG) and os.path.isdir(dir_path):
+                logger.debug(f"Directory contents: {os.listdir(dir_path)}")
             
-            friendly_name = self.service_mapping_manager.get_friendly_name(dir_path)
-            service_name = self.service_mapping_manager.get_service_name(dir_path)
-            base_path = self.service_mapping_manager.get_base_path(dir_path)
+            mapping = self.service_mapping_manager.get_mapping(dir_path)
+            friendly_name = mapping.friendly_name if mapping else None
+            service_name = mapping.service_name if mapping else None
+            base_path = mapping.base_path if mapping else None
             
             logger.info(f"Service mapping results:")
             logger.info(f"- Friendly name: {friendly_name}")
@@ -49,80 +86,35 @@ class RepositoryProcessor:
             
             if not all([friendly_name, service_name, base_path]):
                 logger.error(f"Missing service mapping information for {repo_name}")
-                return
+                return None
                 
             logger.info(f"Processing local directory: {repo_name} ({friendly_name})")
 
-            # Load application properties for property resolution
-            self.service_mapping_manager.load_application_properties(dir_path)
-
             # Parse Java files
             logger.info(f"Creating parser for directory: {dir_path}")
-            logger.info(f"Directory contents: {os.listdir(dir_path)}")
-            logger.info(f"Java files: {list(Path(dir_path).rglob('*.java'))}")
-            
-            # Parse dependencies
-            parser = JavaSpringParser(dir_path)
-            logger.info("Parsing project...")
-            dependency_graph = parser.parse_project()
-            logger.info(f"Found {len(dependency_graph.endpoints)} endpoints, {len(dependency_graph.dtos)} DTOs, {len(dependency_graph.entities)} entities, {len(dependency_graph.services)} services")
-            
-            # Convert to dictionary for Neo4j storage
-            logger.info("Converting to dictionary...")
-            graph_dict = {
-                'endpoints': [endpoint.model_dump() for endpoint in dependency_graph.endpoints],
-                'dtos': {name: dto.model_dump() for name, dto in dependency_graph.dtos.items()},
-                'entities': {name: entity.model_dump() for name, entity in dependency_graph.entities.items()},
-                'services': {name: service.model_dump() for name, service in dependency_graph.services.items()}
-            }
-
-            # Parse FeignClient service calls
-            logger.info("Parsing FeignClient service calls...")
-            feign_parser = FeignClientParser(self.service_mapping_manager)
-            service_calls = feign_parser.extract_service_calls(dir_path)
-            logger.info(f"Found {len(service_calls)} service calls")
-
-            # Store in Neo4j
-            logger.info(f"Storing dependency data for {repo_name} in Neo4j")
-            self.neo4j_store.store_repository_data(
-                repo_name, friendly_name, service_name, base_path, graph_dict
-            )
-            
-            # Store service calls
-            if service_calls:
-                logger.info("Storing service calls in Neo4j")
-                self.neo4j_store.store_service_calls(repo_name, service_calls)
-
-            logger.info(f"Successfully processed service: {service_name}")
-            
-            # Optional: Generate and save visualization if Graphviz is available
-            try:
-                from analyze import DependencyVisualizer
-                visualizer = DependencyVisualizer(dependency_graph, service_calls)
-                visualizer.create_graph()
-                visualizer.save(os.path.join("graphs", f"{service_name}_dependencies"), "png")
-                logger.info(f"Generated visualization for {service_name}")
-            except Exception as e:
-                logger.warning("Could not generate visualization (Graphviz may not be installed). Continuing with analysis...")
 
+            return self._collect(dir_path, repo_name, friendly_name, service_name, base_path,
+                                 f"{service_name}_dependencies")
         except Exception as e:
             logger.error(f"Error processing directory {dir_path}: {str(e)}")
             raise
 
-    def process_repository(self, repo_url: str):
+    def collect_repository(self, repo_url: str) -> Optional[CollectedRepository]:
+        """Clone or update a Git repository and parse it."""
         try:
             # Extract repository name from URL
             repo_name = repo_url.split('/')[-1].replace('.git', '')
             repo_path = self.repos_dir / repo_name
             
             # Get service mapping info
-            friendly_name = self.service_mapping_manager.get_friendly_name(str(repo_path))
-            service_name = self.service_mapping_manager.get_service_name(str(repo_path))
-            base_path = self.service_mapping_manager.get_base_path(str(repo_path))
+            mapping = self.service_mapping_manager.get_mapping(str(repo_path))
+            friendly_name = mapping.friendly_name if mapping else None
+            service_name = mapping.service_name if mapping else None
+            base_path = mapping.base_path if mapping else None
             
             if not all([friendly_name, service_name, base_path]):
                 logger.error(f"Missing service mapping information for {repo_name}")
-                return
+                return None
             
             logger.info(f"Processing repository: {repo_name} ({friendly_name})")
             
@@ -130,7 +122,15 @@ class RepositoryProcessor:
             if repo_path.exists():
                 logger.info(f"Updating existing repository: {repo_name}")
                 repo = git.Repo(repo_path)
-                repo.remotes.origin.pull()
+                # ls-remote is a single ref advertisement; skip the fetch when the remote tip is what we have
+                remote_head = repo.git.ls_remote('origin', 'HEAD').split()
+                if remote_head and remote_head[0] == repo.head.commit.hexsha:
+                    logger.info(f"{repo_name} is already at the remote HEAD")
+                else:
+                    # Only the current worktree is parsed, so fetch just the tip instead of pulling history
+                    repo.git.fetch('--depth=1', 'origin')
+                    if repo.head.commit != repo.commit('origin/HEAD'):
+                        repo.git.reset('--hard', 'origin/HEAD')
             else:
                 logger.info(f"Cloning repository: {repo_url}")
                 # Set up Git credentials if provided
@@ -146,91 +146,239 @@ class RepositoryProcessor:
                         repo_path,
                         env=git_env,
                         allow_unsafe_options=True,
-                        config=['credential.helper=store']
+                        config=['credential.helper=store'],
+                        depth=1,
+                        single_branch=True
                     )
                 else:
-                    git.Repo.clone_from(repo_url, repo_path)
+                    git.Repo.clone_from(repo_url, repo_path, depth=1, single_branch=True)
 
-            # Load application properties for property resolution
-            self.service_mapping_manager.load_application_properties(str(repo_path))
+            head_sha = git.Repo(repo_path).head.commit.hexsha
+            if self.ingested_shas.get(repo_name) == head_sha:
+                logger.info(f"Skipping {repo_name}: already ingested at {head_sha}")
+                return None
 
-            # Parse Java files for dependencies
-            parser = JavaSpringParser(str(repo_path))
-            dependency_graph = parser.parse_project()
-            
-            # Convert to dictionary for Neo4j storage
-            graph_dict = {
-                'endpoints': [endpoint.model_dump() for endpoint in dependency_graph.endpoints],
-                'dtos': {name: dto.model_dump() for name, dto in dependency_graph.dtos.items()},
-                'entities': {name: entity.model_dump() for name, entity in dependency_graph.entities.items()},
-                'services': {name: service.model_dump() for name, service in dependency_graph.services.items()}
-            }
+            collected = self._collect(str(repo_path), repo_name, friendly_name, service_name, base_path,
+                                      f"{repo_name}_dependencies")
+            collected.head_sha = head_sha
+            return collected
+        except Exception as e:
+            logger.error(f"Error processing repository {repo_url}: {str(e)}")
+            raise
 
-            # Parse FeignClient service calls
-            logger.info("Parsing FeignClient service calls...")
-            feign_parser = FeignClientParser(self.service_mapping_manager)
-            service_calls = feign_parser.extract_service_calls(str(repo_path))
-            logger.info(f"Found {len(service_calls)} service calls")
-
-            # Store in Neo4j
-            logger.info(f"Storing dependency data for {repo_name} in Neo4j")
-            self.neo4j_store.store_repository_data(
-                repo_name, friendly_name, service_name, base_path, graph_dict
-            )
-            
-            # Store service calls
-            if service_calls:
-                logger.info("Storing service calls in Neo4j")
-                self.neo4j_store.store_service_calls(repo_name, service_calls)
+    def _collect(self, path: str, repo_name: str, friendly_name: str, service_name: str,
+                 base_path: str, graph_name: str) -> CollectedRepository:
+        # Load application properties for property resolution
+        self.service_mapping_manager.load_application_properties(path)
 
-            logger.info(f"Successfully processed repository: {repo_name}")
-            
-            # Optional: Generate and save visualization
+        # Parse dependencies
+        parser = JavaSpringParser(path, max_workers=self.parser_workers, cache_path=self.parse_cache_path)
+        logger.info("Parsing project...")
+        dependency_graph = parser.parse_project()
+        # The parser's own walk gives the file count for free; no separate rglob just for logging
+        logger.info(f"Scanned {len(parser.java_files)} Java files")
+        logger.info(f"Found {len(dependency_graph.endpoints)} endpoints, {len(dependency_graph.dtos)} DTOs, {len(dependency_graph.entities)} entities, {len(dependency_graph.services)} services")
+        
+        # Convert to dictionary for Neo4j storage; one model_dump walks the whole graph in pydantic-core
+        graph_dict = dependency_graph.model_dump()
+
+        # Parse FeignClient service calls
+        logger.info("Parsing FeignClient service calls...")
+        feign_parser = FeignClientParser(self.service_mapping_manager)
+        service_calls = feign_parser.extract_service_calls(path, parser.java_files)
+        logger.info(f"Found {len(service_calls)} service calls")
+
+        # Optional: Generate and save visualization if Graphviz is available
+        if self.generate_graphs:
             try:
-                from analyze import DependencyVisualizer
                 visualizer = DependencyVisualizer(dependency_graph, service_calls)
                 visualizer.create_graph()
-                visualizer.save(os.path.join("graphs", f"{repo_name}_dependencies"), "png")
+                visualizer.save(os.path.join("graphs", graph_name), "png")
+                logger.info(f"Generated visualization for {repo_name}")
             except Exception as e:
-                logger.warning(f"Failed to generate visualization for {repo_name}: {str(e)}")
+                logger.warning(f"Failed to generate visualization for {repo_name} (Graphviz may not be installed): {str(e)}")
 
-        except Exception as e:
-            logger.error(f"Error processing repository {repo_url}: {str(e)}")
-            raise
+        return CollectedRepository(repo_name, friendly_name, service_name, base_path, graph_dict, service_calls)
+
+def _affected_repository_count(dependencies: List[Dict]) -> int:
+    """Distinct repositories on either side of a cross-service dependency, in one pass"""
+    return len(set(itertools.chain.from_iterable((d["from_repo"], d["to_repo"]) for d in dependencies)))
+
+def _repository_component(repo_data: Dict) -> Dict:
+    """One repository's entry under "components" in dependency_analysis.json"""
+    return {
+        "endpoints": [
+            {
+                "path": endpoint.get("path"),
+                "method": endpoint.get("method"),
+                "controller": endpoint.get("controller_class"),
+                "request_dto": endpoint.get("request_dto"),
+                "response_dto": endpoint.get("response_dto")
+            }
+            for endpoint in repo_data.get('endpoints', [])
+        ],
+        "services": [
+            {
+                "name": service.get("name"),
+                "methods": service.get("methods", []),
+                "used_dtos": service.get("used_dtos", []),
+                "used_entities": service.get("used_entities", [])
+            }
+            for service in repo_data.get('services', [])
+        ],
+        "entities": [
+            {
+                "name": entity.get("name"),
+                "table": entity.get("table_name"),
+                "fields": dict(zip(entity.get("field_names") or [], entity.get("field_types") or [])),
+                "relationships": entity.get("relationships", [])
+            }
+            for entity in repo_data.get('entities', [])
+        ]
+    }
+
+def _nested_json(value, depth: int) -> bytes:
+    # Encoded JSON never holds a raw newline inside a string, so re-indenting is a plain replace
+    return dump_json(value).replace(b'\n', b'\n' + b'  ' * depth)
+
+def _write_report_streaming(path: str, head: Dict, stream_key: str, stream_items: Iterator[Tuple[str, Dict]]):
+    """Write head plus a stream_key object whose members are encoded as they come.
+
+    The bytes match dump_json of the whole report, but only one member is held encoded at a time.
+    The document goes to a temporary file next to path and replaces it only once complete, so a
+    failure part way through the stream leaves any previous report in place.
+    """
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(b'{')
+            for key, value in head.items():
+                f.write(b'\n  ' + dump_json(key) + b': ' + _nested_json(value, 1) + b',')
+            f.write(b'\n  ' + dump_json(stream_key) + b': {')
+            empty = True
+            for key, value in stream_items:
+                f.write((b'\n    ' if empty else b',\n    ') + dump_json(key) + b': ' + _nested_json(value, 2))
+                empty = False
+            f.write(b'}' if empty else b'\n  }')
+            f.write(b'\n}')
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _collect_entry(collector: RepositoryCollector, entry: RepositoryEntry) -> Optional[CollectedRepository]:
+    """Module level so worker processes can pickle it"""
+    return collector.collect_entry(entry)
+
+def _collect_in_background(collector: RepositoryCollector, entries: List[RepositoryEntry], max_pending: int = 4
+                           ) -> Iterator[Tuple[RepositoryEntry, Optional[CollectedRepository], Optional[Exception]]]:
+    """Yield (entry, result, error) in order while a producer thread collects ahead, at most max_pending results"""
+    results = queue.Queue(maxsize=max_pending)
+
+    def produce():
+        for entry in entries:
+            try:
+                results.put((entry, collector.collect_entry(entry), None))
+            except Exception as e:
+                results.put((entry, None, e))
+        results.put(None)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while (item := results.get()) is not None:
+        yield item
+
+class RepositoryProcessor:
+    def __init__(self, neo4j_uri: str, neo4j_user: str, neo4j_password: str, neo4j_database: str = 'neo4j'):
+        self.neo4j_store = Neo4jStore(
+            neo4j_uri, neo4j_user, neo4j_password,
+            max_connection_pool_size=int(os.getenv('NEO4J_POOL_SIZE', '64')),
+            connection_acquisition_timeout=float(os.getenv('NEO4J_ACQUISITION_TIMEOUT', '60')),
+            database=neo4j_database
+        )
+        self.service_mapping_manager = ServiceMappingManager()
+        self.repos_dir = Path("repos")
+        self.repos_dir.mkdir(exist_ok=True)
+        
+        # Get Git credentials from environment
+        self.git_username = os.getenv('GIT_USERNAME')
+        self.git_password = os.getenv('GIT_PASSWORD')
+        # Optional sqlite file for reusing per-file parse results across runs
+        self.parse_cache_path = os.getenv('PARSE_CACHE_PATH')
+        # Repositories cloned and parsed in parallel (1 keeps everything in this process)
+        self.repo_workers = int(os.getenv('REPO_WORKERS', str(os.cpu_count() or 1)))
+        self.generate_graphs = os.getenv('GENERATE_GRAPHS', 'true').lower() in ('1', 'true', 'yes')
+        
+        # Load service mappings
+        self.service_mapping_manager.load_from_repositories_file('repositories.txt')
+
+    def _collector(self, parser_workers: Optional[int] = None) -> RepositoryCollector:
+        return RepositoryCollector(
+            self.service_mapping_manager, self.repos_dir,
+            git_username=self.git_username, git_password=self.git_password,
+            parse_cache_path=self.parse_cache_path, parser_workers=parser_workers,
+            generate_graphs=self.generate_graphs,
+            ingested_shas=self.neo4j_store.get_repository_head_shas()
+        )
+
+    def _store(self, collected: CollectedRepository):
+        # Store in Neo4j: graph, service calls and the ingested commit go in one transaction
+        logger.info(f"Storing dependency data for {collected.repo_name} in Neo4j")
+        self.neo4j_store.store_repository_data(
+            collected.repo_name, collected.friendly_name, collected.service_name,
+            collected.base_path, collected.graph_dict,
+            service_calls=collected.service_calls, head_sha=collected.head_sha
+        )
+
+        logger.info(f"Successfully processed repository: {collected.repo_name}")
+
+    def process_local_directory(self, dir_path: str):
+        """Process a local directory containing the service code."""
+        collected = self._collector().collect_local_directory(dir_path)
+        if collected:
+            self._store(collected)
+
+    def process_repository(self, repo_url: str):
+        collected = self._collector().collect_repository(repo_url)
+        if collected:
+            self._store(collected)
 
     def process_repositories_file(self, file_path: str):
         """Process a file containing repository URLs or local directories, one per line."""
         try:
-            with open(file_path, 'r') as f:
-                entries = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+            # Already read and split when the mappings were loaded, unless this is a different file
+            entries = self.service_mapping_manager.get_entries(file_path)
 
             logger.info(f"Found {len(entries)} entries to process")
-            
-            for entry in entries:
-                try:
-                    # Split the entry into path and metadata
-                    import shlex
-                    parts = shlex.split(entry)
-                    if len(parts) >= 4:
-                        dir_path = parts[0]
-                        # Convert Windows paths to proper format
-                        dir_path = os.path.normpath(dir_path)
-                        logger.info(f"Processing directory: {dir_path}")
-                        logger.info(f"Full entry: {entry}")
-                        
-                        # Check if directory exists
-                        if os.path.exists(dir_path):
-                            logger.info(f"Directory exists at: {dir_path}")
-                            logger.info(f"Contents: {os.listdir(dir_path)}")
-                            self.process_local_directory(dir_path)
-                        else:
-                            logger.error(f"Directory not found: {dir_path}")
-                            logger.error(f"Current working directory: {os.getcwd()}")
-                    else:
-                        self.process_repository(entry)
-                except Exception as e:
-                    logger.error(f"Failed to process entry {entry}: {str(e)}")
-                    continue
+
+            if self.repo_workers <= 1 or len(entries) <= 1:
+                # Clone/parse the next repository on a thread while this one is written to Neo4j
+                for entry, collected, error in _collect_in_background(self._collector(), entries):
+                    try:
+                        if error:
+                            raise error
+                        if collected:
+                            self._store(collected)
+                    except Exception as e:
+                        logger.error(f"Failed to process entry {entry.line}: {str(e)}")
+                        continue
+            else:
+                # Clone and parse in worker processes; Neo4j writes stay here on the one driver.
+                # Each worker parses its repository serially rather than nesting process pools
+                collector = self._collector(parser_workers=1)
+                with ProcessPoolExecutor(max_workers=min(self.repo_workers, len(entries))) as executor:
+                    futures = {executor.submit(_collect_entry, collector, entry): entry for entry in entries}
+                    for future in as_completed(futures):
+                        entry = futures[future]
+                        try:
+                            collected = future.result()
+                            if collected:
+                                self._store(collected)
+                        except Exception as e:
+                            logger.error(f"Failed to process entry {entry.line}: {str(e)}")
+                            continue
 
             # Generate comprehensive analysis
             self._generate_comprehensive_analysis()
@@ -246,20 +394,15 @@ class RepositoryProcessor:
             # 1. Cross-service dependencies
             dependencies = self.neo4j_store.get_cross_service_dependencies()
             
-            # 2. Get all DTOs and their impact analysis
-            dto_analysis = {}
-            for repo_name, repo_data in self.neo4j_store.get_all_repositories():
-                for dto in repo_data.get('dtos', []):
-                    try:
-                        from analyze import JavaSpringParser, DependencyVisualizer
-                        parser = JavaSpringParser(str(self.repos_dir / repo_name))
-                        dependency_graph = parser.parse_project()
-                        visualizer = DependencyVisualizer(dependency_graph)
-                        dto_name = dto.get('name')
-                        if dto_name:
-                            dto_analysis[f"{repo_name}/{dto_name}"] = visualizer.get_impact_analysis(dto_name)
-                    except Exception as e:
-                        logger.warning(f"Failed to analyze DTO {dto_name} in {repo_name}: {str(e)}")
+            # 2. Get all DTOs and their impact analysis, answered by one query for every DTO
+            repo_dtos = [
+                (repo_name, dto_name) for repo_name, dto_name in self.neo4j_store.get_repository_dto_names() if dto_name
+            ]
+            impacts = self.neo4j_store.get_impact_analysis_bulk([dto_name for _, dto_name in repo_dtos])
+            dto_analysis = {
+                f"{repo_name}/{dto_name}": impacts.get(dto_name, {"error": f"DTO {dto_name} not found"})
+                for repo_name, dto_name in repo_dtos
+            }
 
             # 3. Generate comprehensive report
             report = {
@@ -267,86 +410,22 @@ class RepositoryProcessor:
                 "dto_analysis": dto_analysis,
                 "summary": {
                     "total_dependencies": len(dependencies),
-                    "affected_repositories": len(set(
-                        [d["from_repo"] for d in dependencies] +
-                        [d["to_repo"] for d in dependencies]
-                    )),
+                    "affected_repositories": _affected_repository_count(dependencies),
                     "total_dtos_analyzed": len(dto_analysis)
-                },
-                "components": {}
-            }
-
-            # Process each repository's data
-            for repo_name, repo_data in self.neo4j_store.get_all_repositories():
-                report["components"][repo_name] = {
-                    "endpoints": [
-                        {
-                            "path": endpoint.get("path"),
-                            "method": endpoint.get("method"),
-                            "controller": endpoint.get("controller_class"),
-                            "request_dto": endpoint.get("request_dto"),
-                            "response_dto": endpoint.get("response_dto")
-                        }
-                        for endpoint in repo_data.get('endpoints', [])
-                    ],
-                    "services": [
-                        {
-                            "name": service.get("name"),
-                            "methods": service.get("methods", []),
-                            "used_dtos": service.get("used_dtos", []),
-                            "used_entities": service.get("used_entities", [])
-                        }
-                        for service in repo_data.get('services', [])
-                    ],
-                    "entities": [
-                        {
-                            "name": entity.get("name"),
-                            "table": entity.get("table_name"),
-                            "fields": {
-                                field.split(':')[0]: field.split(':')[1]
-                                for field in (entity.get("fields", "") or "").split(',')
-                                if field and ':' in field
-                            },
-                            "relationships": entity.get("relationships", [])
-                        }
-                        for entity in repo_data.get('entities', [])
-                    ]
                 }
+            }
 
-            # Save comprehensive report
-            with open('dependency_analysis.json', 'w') as f:
-                json.dump(report, f, indent=2)
+            # Save comprehensive report; repositories are read a page at a time and each
+            # component is built and encoded on its own
+            _write_report_streaming('dependency_analysis.json', report, "components",
+                                    ((repo_name, _repository_component(repo_data))
+                                     for repo_name, repo_data in self.neo4j_store.iter_repositories()))
                 
             logger.info("Generated comprehensive analysis: dependency_analysis.json")
             
-            # 4. Try to generate visualizations if Graphviz is available
-            try:
-                # Create graphs directory if it doesn't exist
-                Path("graphs").mkdir(exist_ok=True)
-                
-                for repo_name, repo_data in self.neo4j_store.get_all_repositories():
-                    try:
-                        parser = JavaSpringParser(str(self.repos_dir / repo_name))
-                        dependency_graph = parser.parse_project()
-                        
-                        # Get service calls for visualization
-                        feign_parser = FeignClientParser(self.service_mapping_manager)
-                        service_calls = feign_parser.extract_service_calls(str(self.repos_dir / repo_name))
-                        
-                        visualizer = DependencyVisualizer(dependency_graph, service_calls)
-                        visualizer.create_graph()
-                        visualizer.save(os.path.join("graphs", f"{repo_name}_dependencies"), "png")
-                        logger.info(f"Generated visualization for {repo_name}")
-                    except Exception as e:
-                        logger.warning("Could not generate visualization (Graphviz may not be installed). Continuing with analysis...")
-            except Exception as e:
-                logger.warning("Could not create graphs directory. Skipping visualizations.")
-            
         except Exception as e:
             logger.error(f"Error generating comprehensive analysis: {str(e)}")
             raise
-        finally:
-            self.neo4j_store.close()
 
     def _generate_dependency_report(self):
         """Generate a report of cross-service dependencies."""
@@ -357,16 +436,13 @@ class RepositoryProcessor:
                 "cross_service_dependencies": dependencies,
                 "summary": {
                     "total_dependencies": len(dependencies),
-                    "affected_repositories": len(set(
-                        [d["from_repo"] for d in dependencies] +
-                        [d["to_repo"] for d in dependencies]
-                    ))
+                    "affected_repositories": _affected_repository_count(dependencies)
                 }
             }
 
             # Save report
-            with open('dependency_report.json', 'w') as f:
-                json.dump(report, f, indent=2)
+            with open('dependency_report.json', 'wb') as f:
+                f.write(dump_json(report))
                 
             logger.info("Generated cross-service dependency report: dependency_report.json")
             
@@ -378,10 +454,11 @@ def main():
     neo4j_uri = os.getenv('NEO4J_URI', 'bolt://localhost:7687')
     neo4j_user = os.getenv('NEO4J_USER', 'neo4j')
     neo4j_password = os.getenv('NEO4J_PASSWORD', 'password123')
+    neo4j_database = os.getenv('NEO4J_DATABASE', 'neo4j')
     repositories_file = os.getenv('REPOSITORIES_FILE', 'repositories.txt')
 
     # Create processor and process repositories
-    processor = RepositoryProcessor(neo4j_uri, neo4j_user, neo4j_password)
+    processor = RepositoryProcessor(neo4j_uri, neo4j_user, neo4j_password, neo4j_database)
     processor.process_repositories_file(repositories_file)
 
 if __name__ == "__main__":
@@ -1,13 +1,26 @@
 from dataclasses import dataclass
 from typing import Optional, Dict, List
+import os
 import re
+import shlex
 import yaml
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
 from pathlib import Path
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Path segments that are never a repository name
+_COMMON_SEGMENTS = frozenset({'api', 'v1'})
+# Spring config files under src/main/resources, in load order (later files override earlier ones)
+_PROPERTY_FILES = ('application.yml', 'application.yaml', 'application.properties')
+# A whole value of the form ${property.path}
+_PLACEHOLDER_RE = re.compile(r'\A\$\{(.*)\}\Z', re.DOTALL)
+
 @dataclass
 class ServiceMapping:
     repository_path: str
@@ -15,131 +28,155 @@ class ServiceMapping:
     service_name: str
     base_path: str
 
+@dataclass
+class RepositoryEntry:
+    line: str
+    parts: List[str]
+
+def read_repository_entries(file_path: str) -> List[RepositoryEntry]:
+    """Non-comment lines of a repositories file, each split once by shlex (quoted names stay whole)"""
+    with open(file_path, 'r') as f:
+        lines = [line.strip() for line in f]
+    return [RepositoryEntry(line, shlex.split(line)) for line in lines if line and not line.startswith('#')]
+
 class ServiceMappingManager:
     def __init__(self):
         self.mappings: Dict[str, ServiceMapping] = {}
         self.property_cache: Dict[str, Dict[str, str]] = {}
+        # Entries of the last repositories file loaded, kept so it is not read and split again
+        self.entries: List[RepositoryEntry] = []
+        self.entries_path: Optional[str] = None
 
     def load_from_repositories_file(self, file_path: str):
         """Load service mappings from repositories.txt"""
         try:
             logger.info(f"Loading service mappings from {file_path}")
-            with open(file_path, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        # Split by spaces but preserve quoted strings
-                        import shlex
-                        parts = shlex.split(line)
-                        logger.info(f"Processing line: {line}")
-                        logger.info(f"Split parts: {parts}")
+            self.entries = read_repository_entries(file_path)
+            self.entries_path = os.path.abspath(file_path)
+            for entry in self.entries:
+                parts = entry.parts
+                logger.info(f"Processing line: {entry.line}")
+                logger.info(f"Split parts: {parts}")
+                
+                if len(parts) >= 4:
+                    repo_path = parts[0]
+                    friendly_name = parts[1]  # shlex handles the quotes
+                    service_name = parts[2]
+                    base_path = parts[3]
+                    
+                    # Extract the service directory name as the repo key
+                    repo_key = repo_path.rsplit('/', 1)[-1]  # spring-boot-cloud-eureka-order-service
+                    logger.info(f"Extracted repo key: {repo_key}")
+                    logger.info(f"Full repo path: {repo_path}")
+                    
+                    if repo_key in _COMMON_SEGMENTS:  # Skip common path segments
+                        logger.info(f"Skipping common path segment: {repo_key}")
+                        continue
                         
-                        if len(parts) >= 4:
-                            repo_path = parts[0]
-                            friendly_name = parts[1]  # shlex handles the quotes
-                            service_name = parts[2]
-                            base_path = parts[3]
-                            
-                            # Extract the service directory name as the repo key
-                            repo_key = repo_path.split('/')[-1]  # spring-boot-cloud-eureka-order-service
-                            logger.info(f"Extracted repo key: {repo_key}")
-                            logger.info(f"Full repo path: {repo_path}")
-                            
-                            if repo_key in ['api', 'v1']:  # Skip common path segments
-                                logger.info(f"Skipping common path segment: {repo_key}")
-                                continue
-                                
-                            self.mappings[repo_key] = ServiceMapping(
-                                repository_path=repo_path,
-                                friendly_name=friendly_name,
-                                service_name=service_name,
-                                base_path=base_path
-                            )
-                            logger.info(f"Added mapping for {repo_key}: {self.mappings[repo_key]}")
+                    self.mappings[repo_key] = ServiceMapping(
+                        repository_path=repo_path,
+                        friendly_name=friendly_name,
+                        service_name=service_name,
+                        base_path=base_path
+                    )
+                    logger.info(f"Added mapping for {repo_key}: {self.mappings[repo_key]}")
         except Exception as e:
             logger.error(f"Error loading repository mappings: {str(e)}")
             raise
 
     def load_application_properties(self, repo_path: str):
         """Load application.yml/properties for a repository"""
-        repo_key = repo_path.split('/')[-1]  # Get the last part of the path
-        if repo_key in ['api', 'v1']:  # Skip common path segments
+        repo_key = self._key(repo_path)
+        if repo_key is None:
             return None
         properties = {}
 
-        # Try application.yml
-        yml_path = Path(repo_path) / "src" / "main" / "resources" / "application.yml"
-        if yml_path.exists():
-            try:
-                with open(yml_path, 'r') as f:
-                    yaml_data = yaml.safe_load(f)
-                    self._flatten_dict(yaml_data, "", properties)
-            except Exception as e:
-                logger.warning(f"Error loading application.yml: {str(e)}")
-
-        # Try application.yaml
-        yaml_path = Path(repo_path) / "src" / "main" / "resources" / "application.yaml"
-        if yaml_path.exists():
-            try:
-                with open(yaml_path, 'r') as f:
-                    yaml_data = yaml.safe_load(f)
-                    self._flatten_dict(yaml_data, "", properties)
-            except Exception as e:
-                logger.warning(f"Error loading application.yaml: {str(e)}")
+        # List the resources directory once instead of probing each candidate file
+        resources = Path(repo_path) / "src" / "main" / "resources"
+        try:
+            with os.scandir(resources) as entries:
+                present = {entry.name for entry in entries if entry.is_file()}
+        except OSError:
+            present = set()
 
-        # Try application.properties
-        props_path = Path(repo_path) / "src" / "main" / "resources" / "application.properties"
-        if props_path.exists():
+        # Fixed order, so application.properties still overrides the YAML files
+        for file_name in _PROPERTY_FILES:
+            if file_name not in present:
+                continue
             try:
-                with open(props_path, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#'):
-                            key, value = line.split('=', 1)
-                            properties[key.strip()] = value.strip()
+                if file_name.endswith('.properties'):
+                    self._load_properties_file(resources / file_name, properties)
+                else:
+                    self._load_yaml_file(resources / file_name, properties)
             except Exception as e:
-                logger.warning(f"Error loading application.properties: {str(e)}")
+                logger.warning(f"Error loading {file_name}: {str(e)}")
 
         self.property_cache[repo_key] = properties
 
-    def _flatten_dict(self, d: Dict, prefix: str, result: Dict[str, str]):
-        """Flatten nested dictionary with dot notation"""
-        for key, value in d.items():
-            new_key = f"{prefix}.{key}" if prefix else key
+    def _load_yaml_file(self, path: Path, properties: Dict[str, str]):
+        with open(path, 'r') as f:
+            yaml_data = yaml.load(f, Loader=_YamlLoader)
+            self._flatten_dict(yaml_data, properties)
+
+    @staticmethod
+    def _load_properties_file(path: Path, properties: Dict[str, str]):
+        with open(path, 'r') as f:
+            lines = f.read().splitlines()
+        # Blank lines and lines without '=' split into a single part and are skipped
+        pairs = (line.strip().split('=', 1) for line in lines)
+        properties.update(
+            (kv[0].strip(), kv[1].strip()) for kv in pairs if len(kv) == 2 and not kv[0].startswith('#')
+        )
+
+    @staticmethod
+    def _flatten_dict(d: Dict, result: Dict[str, str]):
+        """Flatten nested dictionary with dot notation; key parts are only joined at the leaves"""
+        # Pushed in reverse so leaves come off the stack in document order
+        stack = [((str(key),), value) for key, value in reversed(d.items())]
+        while stack:
+            path, value = stack.pop()
             if isinstance(value, dict):
-                self._flatten_dict(value, new_key, result)
+                stack.extend((path + (str(key),), sub) for key, sub in reversed(value.items()))
             else:
-                result[new_key] = str(value)
+                result['.'.join(path)] = value if type(value) is str else str(value)
 
     def resolve_property(self, repo_key: str, property_placeholder: str) -> Optional[str]:
         """Resolve ${property.path} to its actual value"""
-        if not property_placeholder.startswith("${") or not property_placeholder.endswith("}"):
+        match = _PLACEHOLDER_RE.match(property_placeholder)
+        if not match:
             return property_placeholder
 
-        property_path = property_placeholder[2:-1]
         properties = self.property_cache.get(repo_key, {})
-        return properties.get(property_path)
+        return properties.get(match.group(1))
+
+    def get_entries(self, file_path: str) -> List[RepositoryEntry]:
+        """Entries of file_path, reusing the already loaded ones when it is the same file"""
+        if os.path.abspath(file_path) == self.entries_path:
+            return self.entries
+        return read_repository_entries(file_path)
+
+    @staticmethod
+    def _key(repo_path: str) -> Optional[str]:
+        """Last path segment, the key mappings and properties are stored under; None for common segments"""
+        repo_key = repo_path.rsplit('/', 1)[-1]
+        return None if repo_key in _COMMON_SEGMENTS else repo_key
+
+    def get_mapping(self, repo_path: str) -> Optional[ServiceMapping]:
+        """Get the whole service mapping for a repository with a single key lookup"""
+        repo_key = self._key(repo_path)
+        return self.mappings.get(repo_key) if repo_key else None
 
     def get_service_name(self, repo_path: str) -> Optional[str]:
         """Get service name for a repository"""
-        repo_key = repo_path.split('/')[-1]  # Get the last part of the path
-        if repo_key in ['api', 'v1']:  # Skip common path segments
-            return None
-        mapping = self.mappings.get(repo_key)
+        mapping = self.get_mapping(repo_path)
         return mapping.service_name if mapping else None
 
     def get_friendly_name(self, repo_path: str) -> Optional[str]:
         """Get friendly name for a repository"""
-        repo_key = repo_path.split('/')[-1]  # Get the last part of the path
-        if repo_key in ['api', 'v1']:  # Skip common path segments
-            return None
-        mapping = self.mappings.get(repo_key)
+        mapping = self.get_mapping(repo_path)
         return mapping.friendly_name if mapping else None
 
     def get_base_path(self, repo_path: str) -> Optional[str]:
         """Get base path for a repository"""
-        repo_key = repo_path.split('/')[-1]  # Get the last part of the path
-        if repo_key in ['api', 'v1']:  # Skip common path segments
-            return None
-        mapping = self.mappings.get(repo_key)
+        mapping = self.get_mapping(repo_path)
         return mapping.base_path if mapping else None
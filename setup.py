@@ -7,7 +7,6 @@ setup(
     install_requires=[
         'javalang==0.13.0',
         'networkx==3.1',
-        'graphviz==0.20.1',
         'pydantic==2.5.1'
     ],
     entry_points={
@@ -0,0 +1,23 @@
+import unittest
+
+from analyze import build_arg_parser
+
+
+class FormatArgumentTest(unittest.TestCase):
+    def test_format_before_project_path(self):
+        args = build_arg_parser().parse_args(['-f', 'svg', 'some/project'])
+        self.assertEqual(args.format, ['svg'])
+        self.assertEqual(args.project_path, 'some/project')
+
+    def test_repeated_format(self):
+        args = build_arg_parser().parse_args(['some/project', '-f', 'svg', '--format', 'pdf'])
+        self.assertEqual(args.format, ['svg', 'pdf'])
+        self.assertEqual(args.project_path, 'some/project')
+
+    def test_format_defaults_to_unset(self):
+        args = build_arg_parser().parse_args(['some/project'])
+        self.assertIsNone(args.format)
+
+
+if __name__ == '__main__':
+    unittest.main()